@@ -1,6 +1,12 @@
-from cupang_updater.main import main
+from multiprocessing import freeze_support
 
 if __name__ == "__main__":
+    # needed by --scan-jobs when compiled with pyinstaller,
+    # must run before cupang_updater parse the command line arguments
+    freeze_support()
+
+    from cupang_updater.main import main
+
     try:
         main()
     except Exception as e:
@@ -10,6 +10,8 @@ import rich.progress
 import rich.status
 import rich.traceback
 
+from .headless import NullProgress, NullStatus, null_live
+
 is_pyinstaller = hasattr(sys, "_MEIPASS") or getattr(sys, "frozen", False)
 
 app_name = "cupang-updater"
@@ -34,6 +36,8 @@ app_has_pycurl = importlib.util.find_spec("pycurl")
 app_stop_event = Event()
 
 app_console = rich.console.Console(tab_size=4)
+# no progress bars, spinners, or colors (cron, systemd, ci), checked before parsing the args since they import this
+app_headless = "--headless" in sys.argv[1:] or not app_console.is_terminal
 app_progress = rich.progress.Progress(
     rich.progress.TextColumn("[bold blue]{task.description}"),
     rich.progress.BarColumn(bar_width=None),
@@ -49,6 +53,10 @@ app_progress = rich.progress.Progress(
 )
 app_status = rich.status.Status("...", console=app_console)
 app_live = partial(rich.live.Live, console=app_console, transient=True)
+if app_headless:
+    app_progress = NullProgress()
+    app_status = NullStatus("...")
+    app_live = null_live
 
 
 rich.traceback.install(console=app_console)
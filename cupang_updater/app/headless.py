@@ -0,0 +1,69 @@
+import itertools
+from contextlib import nullcontext
+
+import rich.progress
+
+
+class NullProgress:
+    """
+    Progress that render nothing, used instead of rich Progress when running headless
+    """
+
+    def __init__(self):
+        self.__task_ids = itertools.count()
+        self.tasks = []
+
+    def add_task(self, description: str, *args, **kwargs) -> rich.progress.TaskID:
+        return rich.progress.TaskID(next(self.__task_ids))
+
+    def update(self, task_id: rich.progress.TaskID, *args, **kwargs) -> None:
+        pass
+
+    def reset(self, task_id: rich.progress.TaskID, *args, **kwargs) -> None:
+        pass
+
+    def advance(self, task_id: rich.progress.TaskID, advance: float = 1) -> None:
+        pass
+
+    def start_task(self, task_id: rich.progress.TaskID) -> None:
+        pass
+
+    def stop_task(self, task_id: rich.progress.TaskID) -> None:
+        pass
+
+    def remove_task(self, task_id: rich.progress.TaskID) -> None:
+        pass
+
+
+class NullStatus:
+    """
+    Status that render no spinner, used instead of rich Status when running headless
+
+    The message is still kept in `status`, it is logged by the callers
+    """
+
+    def __init__(self, status: str = ""):
+        self.status = status
+
+    def update(self, status: str = None, *args, **kwargs) -> None:
+        if status is not None:
+            self.status = status
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+def null_live(*args, **kwargs) -> nullcontext:
+    """
+    Live that render nothing, used instead of rich Live when running headless
+    """
+    return nullcontext()
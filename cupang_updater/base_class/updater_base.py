@@ -1,11 +1,13 @@
 import urllib.error
 from abc import ABC, abstractmethod
+from http import HTTPStatus
 from http.client import HTTPResponse
 from logging import Logger
 from typing import Callable, final
 
 from packaging.version import Version
 
+from ..cache import HttpCache
 from ..logger import LoggerManager
 from ..utils import make_requests, make_url, parse_version
 
@@ -30,6 +32,35 @@ class UpdaterBase(ABC):
     Class variables that need to be set:
 
     - `name`: The updater name (set when creating the class).
+    - `required_hashes` (optional): Hash names compared by `check_update`.
+    - `cache_ttl` (optional): How long (in seconds) a GET response is used without any request.
+    - `check_head_before_download` (optional): Validate the file with a HEAD request in `check_file`.
+    """
+
+    required_hashes: list[str] = []
+    """
+    Hash names (md5, sha1, sha256, sha512) compared by `check_update`.
+
+    Only these are computed when scanning, any other hash is computed when requested.
+    """
+
+    cache_ttl: int = 0
+    """
+    How long (in seconds) a GET response made by `make_requests` is used without any request.
+
+    Plugin updaters can be overridden by the user in `updater_settings.cache_ttl`.
+    """
+
+    check_head_before_download: bool = False
+    """
+    Validate the file with a HEAD request in `check_file`, instead of validating the download response.
+
+    Only needed when the download can't be validated from its response headers.
+    """
+
+    download_condition: Callable[[HTTPResponse], bool] | None = None
+    """
+    Validate the download response headers, set by `check_file`.
     """
 
     @property
@@ -73,6 +104,16 @@ class UpdaterBase(ABC):
         """
         ...
 
+    def get_file_hashes(self) -> dict[str, str] | None:
+        """
+        Return the expected hashes of the downloaded file, for example {"sha256": "..."}
+
+        The download is retried if it doesn't match
+
+        Optional
+        """
+        ...
+
     @final
     def get_log(self) -> Logger:
         """
@@ -102,16 +143,20 @@ class UpdaterBase(ABC):
         *,
         method: str = "GET",
         headers: dict[str, str] = None,
+        data: bytes = None,
         condition: Callable[[HTTPResponse], bool] = None,
     ) -> HTTPResponse | None:
-        """Safely create a request using urllib.request
+        """Safely create a request using the shared keep-alive connection pool
 
         Recommended to use this method instead of creating a new one
 
+        The response body is already read, so the connection can be reused by the next request
+
         Args:
             url (str): The URL for the request.
             method (str, optional): The HTTP method for the request. Defaults to "GET".
             headers (dict[str, str], optional): Additional headers for the request. Defaults to None.
+            data (bytes, optional): The request body, for example a JSON encoded POST body. Defaults to None.
             condition (Callable[[HTTPResponse], bool], optional): A callable that takes an HTTPResponse object and returns a boolean.
                     Defaults to None.
 
@@ -119,20 +164,52 @@ class UpdaterBase(ABC):
             HTTPResponse | None: The HTTPResponse object if successful and the condition (if provided) is met, otherwise None.
         """
 
-        try:
-            res = make_requests(url, method=method, headers=headers)
-        except (urllib.error.URLError, urllib.error.HTTPError, Exception) as e:
-            self.get_log().error(
-                f"Error while requesting data from {url}\n"
-                f"{type(e).__qualname__}: {e}\n"
-                f"Executed with arguments (url={url}, method={method}, headers={headers})"
-            )
-            return
+        # GET responses are used without any request while younger than cache_ttl,
+        # after that, responses with ETag / Last-Modified are revalidated
+        http_cache = HttpCache()
+        cache_key = cache_entry = None
+        fetched = False
+        if method == "GET":
+            cache_key = http_cache.make_key(url, headers)
+            cache_entry = http_cache.get(cache_key)
+
+        if http_cache.is_fresh(cache_entry, self.cache_ttl):
+            self.get_log().debug(f"{url} is still fresh, using cached response")
+            res = http_cache.to_response(cache_entry)
+        else:
+            try:
+                res = make_requests(
+                    url,
+                    method=method,
+                    headers={**(headers or {}), **http_cache.conditional_headers(cache_entry)},
+                    data=data,
+                )
+                fetched = True
+            except urllib.error.HTTPError as e:
+                if e.code != HTTPStatus.NOT_MODIFIED or cache_entry is None:
+                    self.__log_request_error(e, url, method, headers)
+                    return
+                self.get_log().debug(f"{url} is not modified, using cached response")
+                http_cache.refresh(cache_key, cache_entry)
+                res = http_cache.to_response(cache_entry)
+            except (urllib.error.URLError, Exception) as e:
+                self.__log_request_error(e, url, method, headers)
+                return
         if condition is not None:
             if not condition(res):
                 return
+        # only cache what the caller accepted, a rejected response would be served again until it expire
+        if fetched and cache_key is not None:
+            http_cache.put(cache_key, res, self.cache_ttl)
         return res
 
+    def __log_request_error(self, e: Exception, url: str, method: str, headers: dict[str, str] | None):
+        self.get_log().error(
+            f"Error while requesting data from {url}\n"
+            f"{type(e).__qualname__}: {e}\n"
+            f"Executed with arguments (url={url}, method={method}, headers={headers})"
+        )
+
     @final
     def check_head(
         self,
@@ -160,6 +237,33 @@ class UpdaterBase(ABC):
 
         return True
 
+    @final
+    def check_file(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] = None,
+        condition: Callable[[HTTPResponse], bool],
+    ) -> bool:
+        """Check that a URL points to a file, for example by its content type
+
+        The check is done on the download response headers, the download is canceled if the check failed.
+        Set `check_head_before_download` to check with a HEAD request right away.
+
+        Args:
+            url (str): The URL to check
+            condition (Callable[[HTTPResponse], bool]): A callable that takes an HTTPResponse object and returns a boolean
+
+        Returns:
+            bool: False if the HEAD check failed, otherwise True.
+        """
+
+        if self.check_head_before_download:
+            return self.check_head(url, headers=headers, condition=condition)
+
+        self.download_condition = condition
+        return True
+
     @final
     @staticmethod
     def parse_version(version: str) -> Version:
@@ -0,0 +1,4 @@
+from .artifact_store import ArtifactStore
+from .http_cache import HttpCache
+from .jar_store import JarMetadataStore
+from .scan_index import ScanIndex
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..app.app_config import cache_folder
+from ..utils import FileHash, clone_file, ensure_path
+
+
+class ArtifactStoreSingleton(type):
+    _instances = {}
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+
+class ArtifactStore(metaclass=ArtifactStoreSingleton):
+    """
+    Content-addressed store of downloaded files, keyed by their SHA-256.
+
+    A file is looked up by any of its hashes (md5, sha1, sha256, sha512), so when an updater
+    already know the hash of the new file and it is in the store, the download is skipped.
+    Files are placed in and out of the store using a reflink or a hardlink when possible.
+
+    The least recently used files are removed by `prune()` when the store is bigger than `max_size`,
+    the last use is kept in the index, blobs may be hardlinked to installed jars so they are never touched.
+
+    ```python
+    # Example Usage:
+    store = ArtifactStore()
+    if store.install({"md5": "..."}, out) is None:
+        download_to(out)
+        store.put(out)
+    ```
+    """
+
+    DEFAULT_MAX_SIZE = 512 * 2**20
+    INDEX_VERSION = 1
+
+    def __init__(self, store_path: Path | str = cache_folder / "artifacts", max_size: int = DEFAULT_MAX_SIZE):
+        self.store_path = ensure_path(store_path)
+        self.index_path = self.store_path / "index.json"
+        self.max_size = max_size
+        self.__lock = threading.Lock()
+        # sha256 -> other hashes, size, and last_used
+        self.__artifacts: dict[str, dict[str, Any]] = None
+        # (hash name, hash value) -> sha256
+        self.__aliases: dict[tuple[str, str], str] = {}
+
+    def __load(self) -> dict[str, dict[str, Any]]:
+        if self.__artifacts is None:
+            self.__artifacts = {}
+            try:
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if data.get("version") == self.INDEX_VERSION:
+                    self.__artifacts = data["artifacts"]
+            except (OSError, ValueError, KeyError):
+                pass
+            for sha256, artifact in self.__artifacts.items():
+                self.__add_aliases(sha256, artifact)
+        return self.__artifacts
+
+    def __add_aliases(self, sha256: str, artifact: dict[str, Any]):
+        for hash_name in FileHash.SUPPORTED_HASHES:
+            if artifact.get(hash_name):
+                self.__aliases[(hash_name, artifact[hash_name])] = sha256
+
+    def __remove(self, sha256: str):
+        artifact = self.__artifacts.pop(sha256, {})
+        for hash_name in FileHash.SUPPORTED_HASHES:
+            self.__aliases.pop((hash_name, artifact.get(hash_name)), None)
+        blob = self.blob_path(sha256)
+        blob.unlink(missing_ok=True)
+        try:
+            blob.parent.rmdir()
+        except OSError:
+            # not empty
+            pass
+
+    def __save(self):
+        self.store_path.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": self.INDEX_VERSION, "artifacts": self.__artifacts}), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.store_path / "blobs" / sha256[:2] / sha256
+
+    def find(self, hashes: dict[str, str | None]) -> Path | None:
+        """
+        Return the stored file matching any of `hashes`, or None if it is not in the store.
+
+        Parameters:
+        - hashes: Dictionary of hash name and its hash value, for example {"md5": "..."}.
+        """
+        with self.__lock:
+            self.__load()
+            sha256 = None
+            for hash_name, value in hashes.items():
+                if value and hash_name in FileHash.SUPPORTED_HASHES:
+                    sha256 = value.lower() if hash_name == "sha256" else self.__aliases.get((hash_name, value.lower()))
+                    if sha256 in self.__artifacts:
+                        break
+            if sha256 not in self.__artifacts:
+                return None
+
+            blob = self.blob_path(sha256)
+            # a hardlinked file can be changed in place, verify before using it
+            if not blob.exists() or FileHash(blob).sha256() != sha256:
+                self.__remove(sha256)
+                self.__save()
+                return None
+            self.__artifacts[sha256]["last_used"] = time.time()
+            self.__save()
+            return blob
+
+    def install(self, hashes: dict[str, str | None], dest: Path) -> dict[str, str] | None:
+        """
+        Place the stored file matching any of `hashes` at `dest`.
+
+        Parameters:
+        - hashes: Dictionary of hash name and its hash value.
+        - dest: Path of the new file, replaced if it exists.
+
+        Returns:
+        - Dictionary of every supported hash name and its hash value, or None if the file is not in the store.
+        """
+        blob = self.find(hashes)
+        if blob is None:
+            return None
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        clone_file(blob, dest)
+        with self.__lock:
+            artifact = self.__artifacts.get(blob.name, {})
+            return {hash_name: artifact.get(hash_name) for hash_name in FileHash.SUPPORTED_HASHES}
+
+    def put(self, file: Path, hashes: dict[str, str] | None = None) -> dict[str, str]:
+        """
+        Add `file` to the store, the file itself is not changed.
+
+        The hashes are the address of the stored file, so only hashes computed from the content
+        of the file itself (e.g while downloading) must be given, never the ones from the config.
+
+        Parameters:
+        - file: Path to the file.
+        - hashes: Every supported hash of the file, computed from the file if None or incomplete.
+
+        Returns:
+        - Dictionary of every supported hash name and its hash value.
+        """
+        if hashes is None or any(not hashes.get(hash_name) for hash_name in FileHash.SUPPORTED_HASHES):
+            hashes = FileHash(file).compute_all()
+        else:
+            hashes = {hash_name: hashes[hash_name] for hash_name in FileHash.SUPPORTED_HASHES}
+        sha256 = hashes["sha256"]
+        with self.__lock:
+            self.__load()
+            blob = self.blob_path(sha256)
+            if sha256 not in self.__artifacts or not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+                clone_file(file, tmp)
+                os.replace(tmp, blob)
+                artifact = {**hashes, "size": blob.stat().st_size}
+                self.__artifacts[sha256] = artifact
+                self.__add_aliases(sha256, artifact)
+            self.__artifacts[sha256]["last_used"] = time.time()
+            self.__save()
+        return hashes
+
+    def prune(self) -> None:
+        """
+        Remove the least recently used files until the store is smaller than `max_size`.
+        """
+        with self.__lock:
+            artifacts = self.__load()
+            entries = []
+            for sha256, artifact in list(artifacts.items()):
+                try:
+                    size = self.blob_path(sha256).stat().st_size
+                except OSError:
+                    self.__remove(sha256)
+                    continue
+                entries.append((artifact.get("last_used", 0), size, sha256))
+            for tmp in self.store_path.glob("blobs/*/*.tmp"):
+                # leftover of an interrupted put
+                if time.time() - tmp.stat().st_mtime > 3600:
+                    tmp.unlink(missing_ok=True)
+
+            size = sum(x[1] for x in entries)
+            for _, blob_size, sha256 in sorted(entries):
+                if size <= self.max_size:
+                    break
+                self.__remove(sha256)
+                size -= blob_size
+            if self.index_path.exists() or artifacts:
+                self.__save()
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import time
+from email.message import Message
+from pathlib import Path
+from typing import Any
+
+from ..app.app_config import cache_folder
+from ..utils import ensure_path
+from ..utils.url import BufferedResponse
+
+
+class HttpCacheSingleton(type):
+    _instances = {}
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+
+class HttpCache(metaclass=HttpCacheSingleton):
+    """
+    Persistent cache of GET responses.
+
+    While a response is younger than the updater `cache_ttl` it is used without any request.
+    After that, if it carry an ETag or Last-Modified header, the next request send
+    If-None-Match / If-Modified-Since and the cached body is used when the server answer 304 Not Modified.
+
+    The least recently used responses are removed by `prune()` when the cache is bigger than `max_size`.
+
+    ```python
+    # Example Usage:
+    http_cache = HttpCache()
+    key = http_cache.make_key(url, headers)
+    entry = http_cache.get(key)
+    if http_cache.is_fresh(entry, ttl):
+        res = http_cache.to_response(entry)
+    headers = {**headers, **http_cache.conditional_headers(entry)}
+    # 304 -> http_cache.refresh(key, entry), http_cache.to_response(entry)
+    # 200 -> http_cache.put(key, res, ttl)
+    ```
+    """
+
+    # headers that change the response
+    VARY_HEADERS = ("accept", "authorization")
+    DEFAULT_MAX_SIZE = 64 * 2**20
+
+    def __init__(self, cache_path: Path | str = cache_folder / "http", max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_path = ensure_path(cache_path)
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        # set by --no-cache, fresh responses are still revalidated
+        self.no_cache = False
+
+    def make_key(self, url: str, headers: dict[str, str] | None = None) -> str:
+        """
+        Return the cache key of a GET request.
+
+        Parameters:
+        - url: The URL for the request.
+        - headers: Headers for the request, only those in `VARY_HEADERS` are used.
+        """
+        vary = sorted((k.lower(), v) for k, v in (headers or {}).items() if k.lower() in self.VARY_HEADERS)
+        return hashlib.sha256(json.dumps([url, vary]).encode()).hexdigest()
+
+    def __meta_path(self, key: str) -> Path:
+        return self.cache_path / f"{key}.json"
+
+    def __body_path(self, key: str) -> Path:
+        return self.cache_path / f"{key}.body"
+
+    @staticmethod
+    def __write(path: Path, data: bytes):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Return the cached entry of `key`, or None.
+        """
+        try:
+            entry = json.loads(self.__meta_path(key).read_text(encoding="utf-8"))
+            entry["body"] = self.__body_path(key).read_bytes()
+            # mark as recently used
+            os.utime(self.__body_path(key))
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict[str, Any] | None, ttl: int) -> bool:
+        """
+        Return True if `entry` can be used without any request.
+
+        Parameters:
+        - entry: The cached entry.
+        - ttl: How long (in seconds) a response stay fresh.
+        """
+        if entry is None or self.no_cache or not ttl:
+            return False
+        return time.time() - entry["stored_at"] < ttl
+
+    def refresh(self, key: str, entry: dict[str, Any]) -> None:
+        """
+        Restart the freshness of `entry` after it was revalidated.
+        """
+        entry = {k: v for k, v in entry.items() if k != "body"}
+        entry["stored_at"] = time.time()
+        try:
+            self.__write(self.__meta_path(key), json.dumps(entry).encode())
+        except OSError:
+            pass
+
+    def put(self, key: str, res: BufferedResponse, ttl: int = 0) -> None:
+        """
+        Cache `res` if it can be used while fresh (`ttl` is set) or revalidated (has an ETag or Last-Modified header).
+        """
+        etag = res.getheader("etag")
+        last_modified = res.getheader("last-modified")
+        if res.getcode() != 200 or (not ttl and etag is None and last_modified is None):
+            return
+        entry = {
+            "url": res.geturl(),
+            "status": res.getcode(),
+            "reason": res.reason,
+            "headers": res.getheaders(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        try:
+            # body first, an entry without body is a miss
+            self.__write(self.__body_path(key), res.body)
+            self.__write(self.__meta_path(key), json.dumps(entry).encode())
+        except OSError:
+            # caching is best effort
+            pass
+
+    @staticmethod
+    def conditional_headers(entry: dict[str, Any] | None) -> dict[str, str]:
+        """
+        Return If-None-Match / If-Modified-Since headers to revalidate `entry`.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def to_response(entry: dict[str, Any]) -> BufferedResponse:
+        """
+        Create a response from a cached entry.
+        """
+        headers = Message()
+        for k, v in entry["headers"]:
+            headers[k] = v
+        return BufferedResponse(entry["url"], entry["status"], entry["reason"], headers, entry["body"])
+
+    def prune(self) -> None:
+        """
+        Remove the least recently used responses until the cache is smaller than `max_size`.
+        """
+        entries = []
+        for body_path in self.cache_path.glob("*.body"):
+            try:
+                stat = body_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path))
+        for tmp in self.cache_path.glob("*.tmp"):
+            # leftover of an interrupted write
+            if time.time() - tmp.stat().st_mtime > 3600:
+                tmp.unlink(missing_ok=True)
+
+        size = sum(x[1] for x in entries)
+        for _, body_size, body_path in sorted(entries):
+            if size <= self.max_size:
+                break
+            self.__meta_path(body_path.stem).unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            size -= body_size
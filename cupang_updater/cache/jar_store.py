@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..utils import ensure_path
+
+
+class JarMetadataStore:
+    """
+    On-disk (SQLite) store of jar metadata keyed by the SHA-256 of the jar content.
+
+    Byte-identical jars share the same entry, so a store shared by many servers
+    only read the jar info and compute the hashes once per jar build.
+
+    The least recently used entries are evicted when there are more than `max_entries`.
+
+    ```python
+    # Example Usage:
+    store = JarMetadataStore.from_path("cupang-updater/cache/jar_metadata.sqlite3")
+    entry = store.get(FileHash(jar).sha256())
+    if entry is None:
+        entry = store.put(name, version, authors, FileHash(jar).compute_all())
+    ```
+    """
+
+    DEFAULT_MAX_ENTRIES = 4096
+    _instances: dict[Path, "JarMetadataStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, store_path: Path | str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.store_path = ensure_path(store_path)
+        self.max_entries = max_entries
+        self.__lock = threading.Lock()
+        self.__connection: sqlite3.Connection = None
+        # pid of the process that opened the connection
+        self.__pid: int = None
+        # connections inherited from the parent process, kept so they are never used or closed by this process
+        self.__inherited: list[sqlite3.Connection] = []
+
+    @classmethod
+    def from_path(cls, store_path: Path | str):
+        """
+        Return the store of `store_path`, only one instance is created for each path.
+
+        Parameters:
+        - store_path: Path to the SQLite database.
+        """
+        store_path = ensure_path(store_path).absolute()
+        with cls._instances_lock:
+            if store_path not in cls._instances:
+                cls._instances[store_path] = cls(store_path)
+            return cls._instances[store_path]
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.__connection is not None and self.__pid != os.getpid():
+            # forked (e.g scan process pool), a sqlite connection must not be used across fork
+            self.__inherited.append(self.__connection)
+            self.__connection = None
+        if self.__connection is None:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.store_path, timeout=60, isolation_level=None, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jars ("
+                "sha256 TEXT PRIMARY KEY, name TEXT, version TEXT, authors TEXT, hashes TEXT, last_used REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jars_last_used ON jars (last_used)")
+            self.__connection = connection
+            self.__pid = os.getpid()
+        return self.__connection
+
+    def get(self, sha256: str) -> dict[str, Any] | None:
+        """
+        Return the metadata of the jar with content `sha256`, or None if it is not in the store.
+
+        Parameters:
+        - sha256: SHA-256 hash value of the jar.
+
+        Returns:
+        - Dictionary with name, version, authors and hashes, or None.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            row = connection.execute(
+                "SELECT name, version, authors, hashes FROM jars WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE jars SET last_used = ? WHERE sha256 = ?", (time.time(), sha256))
+
+        name, version, authors, hashes = row
+        return {"name": name, "version": version, "authors": json.loads(authors), "hashes": json.loads(hashes)}
+
+    def put(self, name: str, version: str, authors: list[str] | None, hashes: dict[str, str]) -> dict[str, Any]:
+        """
+        Save the metadata of a jar, `hashes` must contain the SHA-256 hash value.
+
+        Parameters:
+        - name, version, authors: Result of `jar_info`.
+        - hashes: Dictionary of hash name and its hash value.
+
+        Returns:
+        - The saved metadata.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO jars VALUES (?, ?, ?, ?, ?, ?)",
+                (hashes["sha256"], name, version, json.dumps(authors), json.dumps(hashes), time.time()),
+            )
+            # evict least recently used
+            connection.execute(
+                "DELETE FROM jars WHERE sha256 IN (SELECT sha256 FROM jars ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        return {"name": name, "version": version, "authors": authors, "hashes": dict(hashes)}
+
+    def close(self):
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
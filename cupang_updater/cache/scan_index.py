@@ -0,0 +1,117 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from ..utils import ensure_path
+
+
+class ScanIndex:
+    """
+    Persistent index of scanned jars, keyed by (path, size, mtime_ns, inode).
+
+    As long as the stat of a jar is unchanged, its hashes and jar info are
+    returned from the index without opening the file.
+
+    ```python
+    # Example Usage:
+    scan_index = ScanIndex("cupang-updater/scan_index.json")
+    jar_stat = jar.stat()
+    entry = scan_index.get(jar, jar_stat)
+    if entry is None:
+        entry = scan_index.put(jar, jar_stat, name, version, authors, hashes)
+    scan_index.save()
+    ```
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_path: Path | str):
+        self.index_path = ensure_path(index_path)
+        self.entries: dict[str, dict[str, Any]] = self.__load__()
+        self.__seen: set[str] = set()
+        self.__changed = False
+
+    def __load__(self) -> dict[str, dict[str, Any]]:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def __key(path: Path) -> str:
+        return str(path.absolute())
+
+    @staticmethod
+    def __stat_key(stat: os.stat_result) -> list[int]:
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def get(self, path: Path, stat: os.stat_result) -> dict[str, Any] | None:
+        """
+        Return the indexed entry of `path` if its stat is unchanged, otherwise None.
+
+        Parameters:
+        - path: Path to the jar.
+        - stat: Result of `path.stat()`.
+
+        Returns:
+        - Dictionary with name, version, authors and hashes, or None.
+        """
+        key = self.__key(path)
+        self.__seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or entry.get("stat") != self.__stat_key(stat):
+            return None
+        return entry
+
+    def put(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        name: str,
+        version: str,
+        authors: list[str] | None,
+        hashes: dict[str, str],
+    ) -> dict[str, Any]:
+        """
+        Index the scan result of `path`.
+
+        Parameters:
+        - path: Path to the jar.
+        - stat: Result of `path.stat()` taken before reading the jar.
+        - name, version, authors: Result of `jar_info`.
+        - hashes: Dictionary of hash name and its hash value.
+
+        Returns:
+        - The new entry.
+        """
+        key = self.__key(path)
+        self.__seen.add(key)
+        entry = {
+            "stat": self.__stat_key(stat),
+            "name": name,
+            "version": version,
+            "authors": authors,
+            "hashes": dict(hashes),
+        }
+        self.entries[key] = entry
+        self.__changed = True
+        return entry
+
+    def save(self):
+        """
+        Write the index to disk, dropping entries of jars that were not seen since it was loaded.
+        """
+        unseen = self.entries.keys() - self.__seen
+        for key in unseen:
+            del self.entries[key]
+        if not self.__changed and not unseen:
+            return
+
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": self.VERSION, "entries": self.entries}), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+        self.__changed = False
@@ -1 +1 @@
-from .plugin_checker import jar_info
+from .plugin_checker import jar_info, jar_scan
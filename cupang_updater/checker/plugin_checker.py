@@ -1,11 +1,15 @@
 import json
+import re
 import zipfile
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import strictyaml as sy
 import toml
 
+from ..cache import JarMetadataStore
+from ..utils.hash import FileHash
+
 jar_yaml_schema = sy.MapCombined(
     {
         sy.Optional("name"): sy.Str(),
@@ -16,6 +20,153 @@ jar_yaml_schema = sy.MapCombined(
     sy.Str(),
     sy.Any(),
 )
+jar_yaml_keys = ("name", "version", "authors", "author")
+yaml_key_regex = re.compile(r"""^(?P<key>[\w][\w.\-]*|"[^"\\]*"|'[^']*')[ \t]*:(?:[ \t]+(?P<value>.*))?$""")
+yaml_single_quoted_regex = re.compile(r"^'((?:[^']|'')*)'[ \t]*(?:#.*)?$")
+yaml_inline_comment_regex = re.compile(r"[ \t]#")
+
+
+class YAMLScanError(ValueError):
+    """Raised by the fast yaml scanner when the document need a real YAML parser"""
+
+
+def yaml_scalar(text: str) -> str | None:
+    """
+    Parse a plain or quoted YAML scalar (without tags, anchors, or multi-line)
+    """
+    text = text.strip()
+    if text.startswith('"'):
+        escaped = False
+        for end, ch in enumerate(text[1:], 1):
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                break
+        else:
+            raise YAMLScanError("unterminated double quoted scalar")
+        rest = text[end + 1 :].strip()
+        if rest and not rest.startswith("#"):
+            raise YAMLScanError("unexpected text after double quoted scalar")
+        try:
+            # json escape is a subset of yaml escape, anything else goes to the real parser
+            return json.loads(text[: end + 1])
+        except ValueError as e:
+            raise YAMLScanError(e)
+    if text.startswith("'"):
+        match = yaml_single_quoted_regex.match(text)
+        if match is None:
+            raise YAMLScanError("invalid single quoted scalar")
+        return match.group(1).replace("''", "'")
+    if text and text[0] in "[]{}|>&*!%@`,?":
+        raise YAMLScanError(f"unsupported yaml indicator {text[0]}")
+
+    value = yaml_inline_comment_regex.split(text, 1)[0].rstrip()
+    if value.startswith("#"):
+        value = ""
+    if ": " in value or value.endswith(":"):
+        raise YAMLScanError("nested mapping")
+    return value or None
+
+
+def yaml_flow_sequence(text: str) -> list[str | None]:
+    """
+    Parse a single line YAML flow sequence of scalars, e.g ["a", 'b', c]
+    """
+    items: list[str] = []
+    item = ""
+    quote = None
+    escaped = False
+    for end, ch in enumerate(text[1:], 1):
+        if quote is not None:
+            item += ch
+            if escaped:
+                escaped = False
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            item += ch
+        elif ch in "[{":
+            raise YAMLScanError("nested flow collection")
+        elif ch in ",]":
+            if item.strip():
+                items.append(item)
+            item = ""
+            if ch == "]":
+                break
+        else:
+            item += ch
+    else:
+        raise YAMLScanError("unterminated flow sequence")
+    rest = text[end + 1 :].strip()
+    if rest and not rest.startswith("#"):
+        raise YAMLScanError("unexpected text after flow sequence")
+    return [yaml_scalar(item) for item in items]
+
+
+def yaml_value(value: str, block: list[str]) -> Any:
+    """
+    Parse the value of a top level key, `block` is the following lines that belong to the key
+    """
+    block = [line.strip() for line in block if line.strip() and not line.lstrip().startswith("#")]
+    value = value.strip()
+    if value.startswith("[") and not block:
+        return yaml_flow_sequence(value)
+    if value and not value.startswith("#"):
+        if block:
+            raise YAMLScanError("multi-line scalar")
+        return yaml_scalar(value)
+    if not block:
+        return None
+    if not all(line == "-" or line.startswith("- ") for line in block):
+        raise YAMLScanError("nested mapping")
+    return [yaml_scalar(line[1:]) for line in block]
+
+
+def yaml_top_level_keys(text: str, keys: Iterable[str]) -> dict[str, Any]:
+    """
+    Read the value of top level `keys` from a YAML document without parsing the whole document
+
+    Every other key (and whatever nested under it) is skipped, which is much faster than strictyaml
+    for plugin.yml with big commands and permissions tree
+
+    Only plain scalar, quoted scalar, and sequence of those are understood,
+    raise YAMLScanError for anything else so the caller can fallback to a real YAML parser
+    """
+    keys = set(keys)
+    result: dict[str, Any] = {}
+    lines = text.lstrip("\ufeff").splitlines()
+
+    def is_block_line(line: str):
+        # nested, comment, blank, or indentless sequence
+        return not line.strip() or line[0] in " \t#" or line == "-" or line.startswith("- ")
+
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        if is_block_line(line):
+            continue
+        if line.rstrip() == "---" and not result:
+            continue
+        match = yaml_key_regex.match(line)
+        if match is None:
+            raise YAMLScanError(f"unsupported line {line!r}")
+        key = match.group("key").strip("'\"")
+        if key not in keys:
+            continue
+        if key in result:
+            raise YAMLScanError(f"duplicate key {key}")
+
+        block_start = index
+        while index < len(lines) and is_block_line(lines[index]):
+            index += 1
+        result[key] = yaml_value(match.group("value") or "", lines[block_start:index])
+    return result
 
 
 def jar_info(path: Path) -> tuple[str, str, str | None]:
@@ -25,7 +176,6 @@ def jar_info(path: Path) -> tuple[str, str, str | None]:
     path: Path = Path(path) if path is not Path else path
     if path.suffix != ".jar":
         raise ValueError("Invalid file, expected .jar")
-    jar = zipfile.ZipFile(path)
     config: dict[str, Any]
     jar_name: str = None
     jar_version: str = None
@@ -37,46 +187,48 @@ def jar_info(path: Path) -> tuple[str, str, str | None]:
         "plugin.yml",
         "bungee.yml",
     ]
-    if any(item in jar.namelist() for item in bukkit_ymls):
-        for bukkit_yml in bukkit_ymls:
-            if bukkit_yml in jar.namelist():
-                j = jar.open(bukkit_yml, "r")
-                break
-
-        config = sy.dirty_load(j.read().decode(), schema=jar_yaml_schema, allow_flow_style=True).data
+    with zipfile.ZipFile(path) as jar:
+        # build once, namelist() create a new list for every call
+        jar_files = set(jar.namelist())
+        bukkit_yml = next((item for item in bukkit_ymls if item in jar_files), None)
 
-        jar_name = config.get("name")
-        jar_version = config.get("version")
-        jar_authors = config.get("authors", config.get("author"))
+        if bukkit_yml is not None:
+            bukkit_yml_text = jar.read(bukkit_yml).decode()
+            try:
+                config = yaml_top_level_keys(bukkit_yml_text, jar_yaml_keys)
+            except YAMLScanError:
+                config = sy.dirty_load(bukkit_yml_text, schema=jar_yaml_schema, allow_flow_style=True).data
 
-        j.close()
+            jar_name = config.get("name")
+            jar_version = config.get("version")
+            jar_authors = config.get("authors", config.get("author"))
 
-    # Velocity
-    elif "velocity-plugin.json" in jar.namelist():
-        with jar.open("velocity-plugin.json", "r") as j:
-            config = json.load(j)
+        # Velocity
+        elif "velocity-plugin.json" in jar_files:
+            with jar.open("velocity-plugin.json", "r") as j:
+                config = json.load(j)
 
-            jar_name = config.get("name", config.get("id"))
-            jar_version = config.get("version")
-            jar_authors = config.get("authors")
+                jar_name = config.get("name", config.get("id"))
+                jar_version = config.get("version")
+                jar_authors = config.get("authors")
 
-    # Fabric
-    elif "fabric.mod.json" in jar.namelist():
-        with jar.open("fabric.mod.json", "r") as j:
-            config = json.load(j)
+        # Fabric
+        elif "fabric.mod.json" in jar_files:
+            with jar.open("fabric.mod.json", "r") as j:
+                config = json.load(j)
 
-            jar_name = config.get("name", config.get("id"))
-            jar_version = config.get("version")
-            jar_authors = config.get("authors")
+                jar_name = config.get("name", config.get("id"))
+                jar_version = config.get("version")
+                jar_authors = config.get("authors")
 
-    # Forge
-    elif "META-INF/mods.toml" in jar.namelist():
-        with jar.open("META-INF/mods.toml", "r") as j:
-            config = toml.loads(j.read().decode())
+        # Forge
+        elif "META-INF/mods.toml" in jar_files:
+            with jar.open("META-INF/mods.toml", "r") as j:
+                config = toml.loads(j.read().decode())
 
-            jar_name = config["mods"][0]["modId"] if config.get("mods") else None
-            jar_version = config["mods"][0]["version"] if config.get("mods") else None
-            jar_authors = config["mods"][0]["authors"] if config.get("mods") else None
+                jar_name = config["mods"][0]["modId"] if config.get("mods") else None
+                jar_version = config["mods"][0]["version"] if config.get("mods") else None
+                jar_authors = config["mods"][0]["authors"] if config.get("mods") else None
 
     # Ensure authors are represent in list
     if isinstance(jar_authors, str):
@@ -93,3 +245,42 @@ def jar_info(path: Path) -> tuple[str, str, str | None]:
     jar_version = str(jar_version)
 
     return jar_name, jar_version, jar_authors
+
+
+def jar_scan(
+    path: Path,
+    store_path: Path | None = None,
+    hash_names: Iterable[str] = FileHash.SUPPORTED_HASHES,
+    known_hashes: dict[str, str] = None,
+) -> tuple[str, str, str | None, dict[str, str]]:
+    """
+    return name, version, authors, hashes
+
+    only `hash_names` are computed, hashes may contain more if they are already known,
+    `known_hashes` (e.g computed while downloading) are used without reading the jar
+
+    when `store_path` is set, the result is shared through `JarMetadataStore` using the jar SHA-256,
+    so byte-identical jars are only read once
+
+    picklable, so it can be used by a process pool
+    """
+    file_hash = FileHash.with_known_hashes(path, known_hashes)
+    store = JarMetadataStore.from_path(store_path) if store_path else None
+    if store is not None:
+        # sha256 is the store key, compute it within the same read
+        hash_names = ["sha256", *hash_names]
+    file_hash.digests(*hash_names)
+
+    if store is not None:
+        metadata = store.get(file_hash.sha256())
+        if metadata is not None:
+            jar_hashes = {**metadata["hashes"], **file_hash.hashes}
+            if jar_hashes.keys() - metadata["hashes"].keys():
+                store.put(metadata["name"], metadata["version"], metadata["authors"], jar_hashes)
+            return metadata["name"], metadata["version"], metadata["authors"], jar_hashes
+
+    jar_name, jar_version, jar_authors = jar_info(path)
+    jar_hashes = dict(file_hash.hashes)
+    if store is not None:
+        store.put(jar_name, jar_version, jar_authors, jar_hashes)
+    return jar_name, jar_version, jar_authors, jar_hashes
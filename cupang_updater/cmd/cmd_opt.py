@@ -3,7 +3,7 @@ import sys
 from argparse import ArgumentParser
 from pathlib import Path
 
-from ..app.app_config import app_config, is_pyinstaller
+from ..app.app_config import app_config, cache_folder, is_pyinstaller
 
 opt = ArgumentParser(Path(sys.executable).name if is_pyinstaller else Path(sys.argv[0]).name)
 
@@ -21,6 +21,38 @@ opt_main_usage.add_argument(
     default=False,
     help="Force to do update check despite the cooldown (default: %(default)s)",
 )
+opt_main_usage.add_argument(
+    "--check-jobs",
+    dest="check_jobs",
+    action="store",
+    metavar="N",
+    default=5,
+    type=int,
+    help="Number of update checks running at once, each in its own thread (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--download-segments",
+    dest="download_segments",
+    action="store",
+    metavar="N",
+    default=4,
+    type=int,
+    help="Download files bigger than 8 MiB in N parts at once when the server support it, 1 to disable (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--headless",
+    dest="headless",
+    action="store_true",
+    default=False,
+    help="Plain log lines without progress bars or spinners, enabled when the output is not a terminal (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--no-cache",
+    dest="no_cache",
+    action="store_true",
+    default=False,
+    help="Don't use cached update data that is still fresh, it will be revalidated instead (default: %(default)s)",
+)
 opt_main_usage.add_argument(
     "--scan-only",
     dest="scan_only",
@@ -28,6 +60,38 @@ opt_main_usage.add_argument(
     default=False,
     help="Scan plugins without checking update (default: %(default)s)",
 )
+opt_main_usage.add_argument(
+    "--identify",
+    dest="identify",
+    action="store_true",
+    default=False,
+    help="Look up unconfigured plugins on the update sites by their hash, and fill their config (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--watch",
+    dest="watch",
+    action="store_true",
+    default=False,
+    help="Keep running and rescan plugins when the plugins folder change, implies --scan-only (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--watch-delay",
+    dest="watch_delay",
+    action="store",
+    metavar="SECONDS",
+    default=2.0,
+    type=float,
+    help="Wait until the plugins folder stop changing for this long before rescanning (default: %(default)s)",
+)
+opt_main_usage.add_argument(
+    "--scan-jobs",
+    dest="scan_jobs",
+    action="store",
+    metavar="N",
+    default=1,
+    type=int,
+    help="Number of processes used to scan new or changed plugins, 0 to use every CPU core (default: %(default)s)",
+)
 # opt_main_usage.add_argument(
 #     "--config-dir",
 #     dest="config_dir",
@@ -54,6 +118,15 @@ opt_config_usage.add_argument(
     default=True,
     help="Cleanup your config from unregistered updater (default: %(default)s)",
 )
+opt_config_usage.add_argument(
+    "--metadata-store",
+    dest="metadata_store",
+    action="store",
+    metavar="PATH",
+    default=cache_folder / "jar_metadata.sqlite3",
+    type=Path,
+    help="Set the jar metadata store path, can be shared by many servers (default: %(default)s)",
+)
 
 # opt_ext_usage = opt.add_argument_group("ext updater options")
 # opt_ext_usage.add_argument(
@@ -1,10 +1,23 @@
+import email.parser
+import email.policy
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import select
 import shutil
+import socket
+import threading
+import time
 import urllib.error
-import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from email.message import Message
 from http import HTTPStatus
 from http.client import HTTPResponse
 from pathlib import Path
-from typing import IO
+from typing import IO, Callable, Iterable
 
 import rich.progress
 
@@ -15,63 +28,681 @@ from ..app.app_config import (
     app_stop_event,
     cache_folder,
 )
+from ..cache import ArtifactStore
+from ..cmd.cmd_opt import args
 from ..logger import LoggerManager
+from ..utils.files import reserve_space
+from ..utils.hash import FileHash
+from ..utils.url import BufferedResponse, ConnectionPool, connection_pool, open_url
+from .progress import progress_aggregator
 
+curl_local = threading.local()
+buffer_local = threading.local()
+curl_multi_lock = threading.Lock()
+curl_multi: "CurlMultiEngine | None" = None
 
-def dl_core(task_id: rich.progress.TaskID, url, out: IO[bytes], headers: dict[str, str]) -> None:
-    CHUNK_SIZE = 8 * 1024
+# files bigger than this are downloaded in many parts at once, if the server support range
+SEGMENT_THRESHOLD = 8 * 2**20
+SEGMENT_MIN_SIZE = 2 * 2**20
+# curl body chunks (up to 16 KiB each) waiting to be written, the transfer is paused when more are queued
+CURL_QUEUED_CHUNKS = 64
 
-    # make connection
-    res: HTTPResponse = urllib.request.urlopen(
-        urllib.request.Request(
-            url,
-            method="GET",
-            headers=headers,
-        ),
-        timeout=60,
-    )
 
-    # update total size
-    total_size = int(res.headers.get("content-length", 0))
-    app_progress.update(task_id, total=total_size)
+class DownloadRejected(Exception):
+    """
+    Raised when the download response failed the download condition, retrying won't help
+    """
 
-    while True:
-        chunk = res.read(CHUNK_SIZE)
-        if not chunk:
-            break
-        if app_stop_event.is_set():
-            break
-        out.write(chunk)
-        app_progress.update(task_id, advance=len(chunk))
 
-    # close connection
-    res.close()
+class HashMismatch(ValueError):
+    """
+    Raised when the downloaded file is not the same as the expected hash
+    """
+
+
+class HashingFile:
+    """
+    Write to `out` while computing the hashes of every written byte, so the file is not read again
+
+    Bytes written through the file descriptor (`fileno()`) are not hashed, `hexdigests()` return None then
+    """
+
+    def __init__(self, out: IO[bytes], hash_names: Iterable[str] = FileHash.SUPPORTED_HASHES):
+        self.out = out
+        self.hash_names = tuple(hash_names)
+        self.hash_tools = {hash_name: hashlib.new(hash_name) for hash_name in self.hash_names}
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        written = self.out.write(data)
+        for hash_tool in self.hash_tools.values():
+            hash_tool.update(data)
+        self.position += len(data)
+        return written
+
+    def seek(self, offset: int) -> int:
+        if offset != self.position:
+            # hash the existing bytes again (e.g resuming a partial file)
+            self.hash_tools = {hash_name: hashlib.new(hash_name) for hash_name in self.hash_names}
+            self.out.seek(0)
+            self.position = 0
+            while self.position < offset:
+                chunk = self.out.read(min(FileHash.DEFAULT_CHUNK_SIZE, offset - self.position))
+                if not chunk:
+                    break
+                for hash_tool in self.hash_tools.values():
+                    hash_tool.update(chunk)
+                self.position += len(chunk)
+        return self.out.seek(offset)
+
+    def truncate(self, size: int = None) -> int:
+        return self.out.truncate(size)
+
+    def fileno(self) -> int:
+        return self.out.fileno()
+
+    def hexdigests(self) -> dict[str, str] | None:
+        # the file was written out of order (segmented download) if it is not the same size as the hashed bytes
+        self.out.flush()
+        if os.fstat(self.out.fileno()).st_size != self.position:
+            return None
+        return {hash_name: hash_tool.hexdigest() for hash_name, hash_tool in self.hash_tools.items()}
+
+
+class ReadBuffer:
+    """
+    Reusable read buffer of a download thread, responses are read into it without allocating a new bytes every chunk
+
+    The chunk size grow while the reads are fast and shrink when they are slow, a big chunk keep the
+    python overhead per byte small on a fast link, a small chunk keep cancel and progress responsive on a slow one
+    """
+
+    MIN_SIZE = 64 * 2**10
+    MAX_SIZE = 2**20
+    # how long a single read should take
+    TARGET_TIME = 0.05
+
+    def __init__(self):
+        self.buffer = bytearray(self.MAX_SIZE)
+        self.view = memoryview(self.buffer)
+        self.size = self.MIN_SIZE
+
+    def readinto(self, res: HTTPResponse, limit: int = None) -> memoryview:
+        """
+        Read up to the chunk size (or `limit`) from `res`, the returned view is overwritten by the next read
+        """
+        size = self.size if limit is None else min(self.size, limit)
+        start = time.perf_counter()
+        read = res.readinto(self.view[:size])
+        elapsed = time.perf_counter() - start
+        if read == self.size and elapsed < self.TARGET_TIME / 2:
+            self.size = min(self.size * 2, self.MAX_SIZE)
+        elif elapsed > self.TARGET_TIME * 2:
+            self.size = max(self.size // 2, self.MIN_SIZE)
+        return self.view[:read]
+
+
+def get_read_buffer() -> ReadBuffer:
+    """
+    Return the read buffer of the current thread.
+    """
+    buffer = getattr(buffer_local, "buffer", None)
+    if buffer is None:
+        buffer = buffer_local.buffer = ReadBuffer()
+    return buffer
+
+
+class PartialDownload:
+    """
+    The `._incomplete` file of a download, and the validators (ETag / Last-Modified) needed to resume it
+
+    A failed download keep its partial file, the next attempt only request the remaining bytes using
+    `Range` and `If-Range`, the server send the whole file instead if it changed or if it can't resume.
+    """
+
+    def __init__(self, out: Path, url: str):
+        self.url = url
+        self.path = out.with_suffix("._incomplete")
+        self.meta_path = self.path.with_name(self.path.name + ".json")
+        self.offset = 0
+        self.size: int | None = None
+        self.validator: str | None = None
+
+        try:
+            meta: dict = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            if meta.get("url") == url and meta.get("validator") and self.path.exists():
+                self.offset = self.path.stat().st_size
+                self.size = meta.get("size")
+                self.validator = meta["validator"]
+        except (OSError, ValueError):
+            pass
+
+    def open(self) -> IO[bytes]:
+        return self.path.open("r+b" if self.offset else "w+b")
+
+    def get_headers(self) -> dict[str, str]:
+        """
+        Return headers that request the remaining bytes
+        """
+        if not self.offset or not self.validator:
+            return {}
+        return {"Range": f"bytes={self.offset}-", "If-Range": self.validator}
+
+    def is_complete(self) -> bool:
+        return self.size is not None and self.offset == self.size
+
+    def start(self, status: int, headers: Message, out: IO[bytes]) -> None:
+        """
+        Prepare `out` for the response body, call it before writing the body
+
+        Resume from the partial file on 206, start over on anything else
+        """
+        content_range = headers.get("content-range", "")
+        match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", content_range.strip())
+        if status == HTTPStatus.PARTIAL_CONTENT and match and int(match.group(1)) == self.offset:
+            total = match.group(2)
+            self.size = int(total) if total != "*" else None
+        else:
+            self.offset = 0
+            content_length = headers.get("content-length")
+            self.size = int(content_length) if content_length and content_length.isdigit() else None
+        out.seek(self.offset)
+        out.truncate()
+
+        self.validator = self.get_validator(headers)
+        if self.validator:
+            self.meta_path.write_text(
+                json.dumps({"url": self.url, "validator": self.validator, "size": self.size}), encoding="utf-8"
+            )
+        else:
+            self.meta_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def get_validator(headers: Message) -> str | None:
+        # weak etag can't be used in If-Range
+        etag = headers.get("etag")
+        return etag if etag and not etag.startswith("W/") else headers.get("last-modified")
+
+    def forget(self):
+        """
+        Make the partial file not resumable, for example when it is written out of order
+        """
+        self.validator = None
+        self.meta_path.unlink(missing_ok=True)
+
+    def discard(self):
+        self.offset = 0
+        self.size = self.validator = None
+        self.path.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+
+
+def dl_core(
+    task_id: rich.progress.TaskID,
+    url,
+    out: IO[bytes],
+    headers: dict[str, str],
+    condition: Callable[[HTTPResponse], bool] = None,
+    partial: PartialDownload = None,
+) -> None:
+    if partial is not None:
+        headers = {**headers, **partial.get_headers()}
+
+    # make connection, reusing a keep-alive connection to the same host if there is one
+    try:
+        with open_url(url, headers=headers, timeout=60) as res:
+            res: HTTPResponse
+
+            # validate before reading the body
+            if condition is not None and not condition(res):
+                raise DownloadRejected(f"{url} response is rejected, content-type: {res.getheader('content-type')}")
+
+            # big file from a server that support range, download many parts at once
+            total_size = int(res.headers.get("content-length", 0))
+            validator = PartialDownload.get_validator(res.headers)
+            # segments are written with os.pwrite, which windows doesn't have
+            if (
+                args.download_segments > 1
+                and hasattr(os, "pwrite")
+                and res.status == HTTPStatus.OK
+                and total_size >= SEGMENT_THRESHOLD
+                and res.getheader("accept-ranges", "").lower() == "bytes"
+                and validator
+                and "Range" not in headers
+            ):
+                if partial is not None:
+                    partial.forget()
+                dl_segmented(task_id, url, res, out, headers, validator, total_size, args.download_segments)
+                return
+
+            # resume or start over
+            offset = 0
+            if partial is not None:
+                partial.start(res.status, res.headers, out)
+                offset = partial.offset
+
+            # update total size
+            app_progress.update(task_id, total=offset + total_size, completed=offset)
+
+            # reserve the rest of the file, so it is written into contiguous blocks
+            if total_size:
+                reserve_space(out.fileno(), offset, total_size)
+
+            buffer = get_read_buffer()
+            progress = progress_aggregator.counter(task_id)
+            try:
+                while not app_stop_event.is_set():
+                    chunk = buffer.readinto(res)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    progress.advance(len(chunk))
+            finally:
+                progress_aggregator.release(progress)
+            received = progress.value
+
+            # read() return nothing when the connection is closed early, the partial file is resumed by the next attempt
+            if total_size and received < total_size and not app_stop_event.is_set():
+                raise http.client.IncompleteRead(b"", total_size - received)
+    except urllib.error.HTTPError as e:
+        if e.code != HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE or partial is None:
+            raise
+        if partial.is_complete():
+            # already downloaded before the previous attempt failed
+            return
+        partial.discard()
+        raise
 
     return  # intended to run in another thread, should return something
 
 
-def dl_core_curl(task_id: rich.progress.TaskID, url, out: IO[bytes], headers: dict[str, str]):
-    # setup callback
+def write_range(
+    task_id: rich.progress.TaskID,
+    res: HTTPResponse,
+    fd: int,
+    start: int,
+    end: int,
+    cancel_event: threading.Event,
+) -> None:
+    # write bytes start to end (inclusive) of the file from res
+    buffer = get_read_buffer()
+    progress = progress_aggregator.counter(task_id)
+    position = start
+    try:
+        while position <= end:
+            if app_stop_event.is_set() or cancel_event.is_set():
+                return
+            chunk = buffer.readinto(res, end + 1 - position)
+            if not chunk:
+                raise http.client.IncompleteRead(b"", end + 1 - position)
+            progress.advance(len(chunk))
+            while chunk:
+                written = os.pwrite(fd, chunk, position)
+                chunk = chunk[written:]
+                position += written
+    finally:
+        progress_aggregator.release(progress)
+
+
+def dl_segment(
+    task_id: rich.progress.TaskID,
+    url: str,
+    fd: int,
+    headers: dict[str, str],
+    validator: str,
+    start: int,
+    end: int,
+    cancel_event: threading.Event,
+) -> None:
+    if app_stop_event.is_set() or cancel_event.is_set():
+        # another segment failed before this one started
+        return
+    headers = {**headers, "Range": f"bytes={start}-{end}", "If-Range": validator}
+    with open_url(url, headers=headers, timeout=60) as res:
+        content_range = res.getheader("content-range", "")
+        if res.status != HTTPStatus.PARTIAL_CONTENT or not content_range.startswith(f"bytes {start}-"):
+            # the file changed since the first part
+            raise http.client.HTTPException(f"expecting range {start}-{end} but got {res.status} {content_range}")
+        write_range(task_id, res, fd, start, end, cancel_event)
+
+
+def dl_segmented(
+    task_id: rich.progress.TaskID,
+    url: str,
+    res: HTTPResponse,
+    out: IO[bytes],
+    headers: dict[str, str],
+    validator: str,
+    total_size: int,
+    segments: int,
+) -> None:
+    """
+    Download `total_size` bytes into `out` using `segments` ranges at once
+
+    The first range is read from `res`, the others are requested with `Range` and `If-Range: validator`
+    """
+    segments = min(segments, -(-total_size // SEGMENT_MIN_SIZE))
+    segment_size = -(-total_size // segments)
+    ranges = [(start, min(start + segment_size, total_size) - 1) for start in range(0, total_size, segment_size)]
+
+    fd = out.fileno()
+    try:
+        reserved = reserve_space(fd, 0, total_size, keep_size=False)
+    except OSError:
+        reserved = False
+    if not reserved:
+        # segments are written anywhere in the file, it need its full size first
+        out.truncate(total_size)
+    app_progress.update(task_id, total=total_size, completed=0)
+
+    cancel_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(ranges) - 1, thread_name_prefix="dl_segment") as executor:
+        jobs = [
+            executor.submit(dl_segment, task_id, url, fd, headers, validator, start, end, cancel_event)
+            for start, end in ranges[1:]
+        ]
+        try:
+            write_range(task_id, res, fd, *ranges[0], cancel_event)
+            # the rest of the response is not needed, give back the connection slot right away
+            connection_pool.release(res)
+            for job in jobs:
+                job.result()
+        except BaseException:
+            cancel_event.set()
+            # the queued segments may wait for the connection slot of res, and are not needed anymore
+            connection_pool.release(res)
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def get_curl():
+    """
+    Return the curl handle of the current thread.
+
+    The handle is reused by the next download of the same thread,
+    the connections (and TLS sessions) are kept alive by `CurlMultiEngine`.
+    """
+    import pycurl
+
+    curl = getattr(curl_local, "curl", None)
+    if curl is None:
+        curl = curl_local.curl = pycurl.Curl()  # type: ignore # noqa
+    return curl
+
+
+class CurlMultiEngine:
+    """
+    Drive the network side of every curl download from a single thread using CurlMulti
+
+    DNS, TLS sessions, and connections are shared between handles with CurlShare, and downloads from the same
+    host are multiplexed over one HTTP/2 connection where available. The transfers (and their callbacks) run on
+    the engine thread, so the callbacks should only pass the data on.
+
+    `submit()` doesn't block, it return a future which is done when the transfer finished, use
+    `Future.add_done_callback` to be called back instead of waiting. `perform()` wait for it.
+
+    Note that `dl_core_curl` still take one download thread for each transfer, that thread write and hash the
+    data and wait for the future. The engine share connections, it doesn't reduce the number of download threads.
+
+    The engine thread stops when there is nothing to download, and started again by the next `submit()`.
+    """
+
+    # longest wait for socket activity, submit() and resume() wake the engine up right away
+    SELECT_TIMEOUT = 1.0
+
+    def __init__(self):
+        import pycurl
+
+        self.__lock = threading.Lock()
+        self.__pending: list[tuple[pycurl.Curl, Future]] = []
+        # paused handles to continue
+        self.__resumed: list[pycurl.Curl] = []
+        self.__thread: threading.Thread | None = None
+        # written by other threads to interrupt the select of the engine thread
+        self.__wakeup_reader, self.__wakeup_writer = socket.socketpair()
+        self.__wakeup_reader.setblocking(False)
+        self.__wakeup_writer.setblocking(False)
+
+        self.share = pycurl.CurlShare()
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        try:
+            self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+        except (AttributeError, pycurl.error):
+            # old libcurl, connections are still shared by the multi handle
+            pass
+
+        self.multi = pycurl.CurlMulti()
+        self.multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, ConnectionPool.MAX_CONNECTIONS_PER_HOST)
+        try:
+            self.multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+        except (AttributeError, pycurl.error):
+            # libcurl without http2
+            pass
+
+    def perform(self, curl) -> None:
+        """
+        Run the transfer of `curl` on the engine thread, and wait for it
+
+        Raise pycurl.error if the transfer failed, like `curl.perform()`
+        """
+        self.submit(curl).result()
+
+    def submit(self, curl) -> Future:
+        """
+        Start the transfer of `curl` on the engine thread
+
+        The future is done when the transfer finished, with pycurl.error if it failed
+        """
+        import pycurl
+
+        # curl.reset() clear the share in libcurl but not in pycurl, which then refuse to share it again
+        curl.unsetopt(pycurl.SHARE)
+        curl.setopt(pycurl.SHARE, self.share)
+        try:
+            curl.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+            # wait for a connection that can be multiplexed instead of opening a new one
+            curl.setopt(pycurl.PIPEWAIT, 1)
+        except (AttributeError, pycurl.error):
+            # libcurl without http2
+            pass
+
+        future = Future()
+        with self.__lock:
+            self.__pending.append((curl, future))
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="curl_multi", daemon=True)
+                self.__thread.start()
+        self.__wakeup()
+        return future
+
+    def resume(self, curl) -> None:
+        """
+        Continue the transfer of `curl` paused by its write callback (WRITEFUNC_PAUSE)
+        """
+        with self.__lock:
+            self.__resumed.append(curl)
+        self.__wakeup()
+
+    def __wakeup(self):
+        try:
+            self.__wakeup_writer.send(b"\0")
+        except OSError:
+            # already full of wakeups
+            pass
+
+    def __run(self):
+        import pycurl
+
+        active: dict[pycurl.Curl, Future] = {}
+        try:
+            self.__drive(active)
+        except BaseException as e:
+            # don't leave the download threads waiting forever
+            with self.__lock:
+                for curl, future in {**dict(self.__pending), **active}.items():
+                    try:
+                        self.multi.remove_handle(curl)
+                    except pycurl.error:
+                        pass
+                    if not future.done():
+                        future.set_exception(e)
+                self.__pending.clear()
+                self.__thread = None
+            raise
+
+    def __drive(self, active: dict):
+        import pycurl
+
+        while True:
+            with self.__lock:
+                for curl, future in self.__pending:
+                    self.multi.add_handle(curl)
+                    active[curl] = future
+                self.__pending.clear()
+                for curl in self.__resumed:
+                    if curl in active:
+                        curl.pause(pycurl.PAUSE_CONT)
+                self.__resumed.clear()
+                if not active:
+                    self.__thread = None
+                    return
+
+            # cancel is handled by the XFERINFOFUNCTION of each handle, the transfer fail when it return 1
+            read, write, error = self.multi.fdset()
+            timeout = self.multi.timeout()
+            timeout = self.SELECT_TIMEOUT if timeout < 0 else min(timeout / 1000, self.SELECT_TIMEOUT)
+            select.select([*read, self.__wakeup_reader], write, error, timeout)
+            try:
+                while self.__wakeup_reader.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+            while True:
+                ret, _ = self.multi.perform()
+                if ret != pycurl.E_CALL_MULTI_PERFORM:
+                    break
+
+            while True:
+                queued, ok_list, err_list = self.multi.info_read()
+                for curl in ok_list:
+                    self.multi.remove_handle(curl)
+                    active.pop(curl).set_result(None)
+                for curl, errno, errmsg in err_list:
+                    self.multi.remove_handle(curl)
+                    active.pop(curl).set_exception(pycurl.error(errno, errmsg))
+                if not queued:
+                    break
+
+
+def get_curl_multi() -> CurlMultiEngine:
+    """
+    Return the curl multi engine, created on the first curl download.
+    """
+    global curl_multi
+    with curl_multi_lock:
+        if curl_multi is None:
+            curl_multi = CurlMultiEngine()
+        return curl_multi
+
+
+def dl_core_curl(
+    task_id: rich.progress.TaskID,
+    url,
+    out: IO[bytes],
+    headers: dict[str, str],
+    condition: Callable[[HTTPResponse], bool] = None,
+    partial: PartialDownload = None,
+):
+    # the callbacks run on the curl multi engine thread, they only hand the body over to this thread,
+    # which write and hash it, so many downloads at once don't slow down each other
+    progress = progress_aggregator.counter(task_id)
+    chunks: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+    last_total = None
+    response: BufferedResponse = None
+    paused = aborted = False
+
     def status(
         dtotal,
         dcurrent,
         utotal,
         ucurrent,
     ):
-        app_progress.update(task_id, total=dtotal)
-        if app_stop_event.is_set():
+        nonlocal last_total
+        if dtotal and dtotal != last_total:
+            last_total = dtotal
+            offset = partial.offset if partial is not None else 0
+            app_progress.update(task_id, total=offset + dtotal)
+        if app_stop_event.is_set() or aborted:
             return 1  # https://curl.se/libcurl/c/CURLOPT_XFERINFOFUNCTION.html
-        app_progress.update(task_id, completed=dcurrent)
         return
 
+    # collect the headers of the last response (after redirects), to validate it before the body is written
+    response_headers: list[str] = []
+    started = rejected = is_success = False
+
+    def collect_header(line: bytes):
+        line = line.decode("iso-8859-1")
+        if line.startswith("HTTP/"):
+            response_headers.clear()
+        response_headers.append(line)
+
+    def get_response() -> BufferedResponse:
+        status_line, *header_lines = response_headers or ["HTTP/1.1 200 OK"]
+        _, status, *reason = status_line.strip().split(" ", 2) + [""]
+        # curl.getinfo can't be used while performing
+        return BufferedResponse(
+            url,
+            int(status),
+            reason[0] if reason else "",
+            email.parser.Parser(policy=email.policy.compat32).parsestr("".join(header_lines)),
+            b"",
+        )
+
+    def start() -> bool:
+        # called before the first byte of the body, return False to abort
+        nonlocal started, rejected, is_success, response
+        started = True
+        response = get_response()
+        is_success = response.status in (HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT)
+        if not is_success:
+            # error body is not written
+            return True
+        if condition is not None and not condition(response):
+            rejected = True
+            return False
+        return True
+
+    def write(data: bytes):
+        nonlocal paused
+        if aborted or (not started and not start()):
+            return 0  # abort, https://curl.se/libcurl/c/CURLOPT_WRITEFUNCTION.html
+        if not is_success:
+            return
+        if chunks.qsize() >= CURL_QUEUED_CHUNKS:
+            # writing is slower than downloading, curl give the same data again when resumed
+            paused = True
+            return pycurl.WRITEFUNC_PAUSE
+        chunks.put(data)
+
+    def open_out():
+        # resume or start over, once the response is accepted
+        if partial is not None:
+            partial.start(response.status, response.headers, out)
+            app_progress.update(task_id, completed=partial.offset)
+
+    if partial is not None:
+        headers = {**headers, **partial.get_headers()}
+
     # setup curl
     import pycurl
 
-    curl = pycurl.Curl()  # type: ignore # noqa
+    curl = get_curl()
 
     # set option
     curl.setopt(curl.URL, url)
-    curl.setopt(curl.WRITEDATA, out)
+    curl.setopt(curl.WRITEFUNCTION, write)
+    curl.setopt(curl.HEADERFUNCTION, collect_header)
     curl.setopt(curl.FOLLOWLOCATION, True)
     curl.setopt(curl.HTTPHEADER, [f"{k}: {v}" for k, v in headers.items()])
     curl.setopt(curl.CONNECTTIMEOUT, 60)
@@ -79,13 +710,55 @@ def dl_core_curl(task_id: rich.progress.TaskID, url, out: IO[bytes], headers: di
     curl.setopt(curl.XFERINFOFUNCTION, status)
 
     # start download
+    engine = get_curl_multi()
+    future = engine.submit(curl)
+    future.add_done_callback(lambda _: chunks.put(None))
     try:
-        curl.perform()
+        is_opened = False
+        while True:
+            try:
+                data = chunks.get(timeout=0.1)
+            except queue.Empty:
+                data = b""
+            if data is None:
+                break
+            if data:
+                if not is_opened:
+                    is_opened = True
+                    open_out()
+                out.write(data)
+                progress.advance(len(data))
+            if paused and chunks.qsize() < CURL_QUEUED_CHUNKS // 2:
+                paused = False
+                engine.resume(curl)
+
+        try:
+            future.result()
+        except pycurl.error:
+            if rejected:
+                raise DownloadRejected(f"{url} response is rejected") from None
+            raise
+        if not started and not start():
+            # empty body
+            raise DownloadRejected(f"{url} response is rejected")
+        if is_success and not is_opened:
+            open_out()
         return_code = HTTPStatus(curl.getinfo(curl.RESPONSE_CODE))
-        if return_code != HTTPStatus.OK:
+        if return_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE and partial is not None:
+            if partial.is_complete():
+                # already downloaded before the previous attempt failed
+                return
+            partial.discard()
+        if return_code not in (HTTPStatus.OK, HTTPStatus.PARTIAL_CONTENT):
             raise pycurl.error(f"{return_code} {return_code.phrase}, {return_code.description}")  # type: ignore # noqa
     finally:
-        curl.close()  # the error will be handled by dl_download
+        if not future.done():
+            # e.g failed to write, stop the transfer before the handle is reused
+            aborted = True
+            engine.resume(curl)
+            wait([future])
+        progress_aggregator.release(progress)
+        curl.reset()  # the error will be handled by dl_download, keep the handle to be reused
 
     return  # intended to run in another thread, should return something
 
@@ -110,7 +783,11 @@ def dl(
     out: Path,
     progress_name: str = None,
     headers: dict[str, str] = None,
-) -> None:
+    condition: Callable[[HTTPResponse], bool] = None,
+) -> dict[str, str] | None:
+    """
+    return the hashes of the downloaded file, or None if canceled
+    """
     log = LoggerManager().get_log()
 
     # setup headers
@@ -133,14 +810,23 @@ def dl(
         description=f"{progress_name[:32] + '...' if len(progress_name) > 35 else progress_name}",
     )
 
-    # dl to tempfile
-    tmp = Path(out.with_suffix("._incomplete"))
-    get_dl_worker()(task_id, url, tmp.open("wb"), headers)
+    # dl to tempfile, resuming the previous attempt if possible
+    partial = PartialDownload(out, url)
+    if partial.offset:
+        log.info(f"Resuming {progress_name} from {partial.offset} bytes")
+    with partial.open() as tmp_file:
+        hashing_file = HashingFile(tmp_file)
+        get_dl_worker()(task_id, url, hashing_file, headers, condition, partial)
+        hashes = hashing_file.hexdigests()
 
     if app_stop_event.is_set():
         log.info(f"[bright_yellow]Canceled {progress_name}")
+        hashes = None
     else:
-        shutil.move(tmp.absolute(), out.absolute())
+        shutil.move(partial.path.absolute(), out.absolute())
+        if hashes is None:
+            # written out of order (segmented download)
+            hashes = FileHash(out).compute_all()
         log.info(f"Downloaded {progress_name}")
 
     # finishing progress bar
@@ -148,30 +834,80 @@ def dl(
     app_progress.stop_task(task_id)
 
     # remove tmp
-    tmp.unlink(missing_ok=True)
+    partial.discard()
 
-    return  # intended to run in another thread, should return something
+    return hashes
+
+
+def verify_hashes(file: Path, actual: dict[str, str], hashes: dict[str, str]) -> None:
+    """
+    Raise HashMismatch if any known hash of `file` (`actual`) is not the same as in `hashes`
+    """
+    expected = {k: v.lower() for k, v in hashes.items() if v and k in FileHash.SUPPORTED_HASHES}
+    for hash_name, value in expected.items():
+        if actual[hash_name] != value:
+            raise HashMismatch(f"{file.name} {hash_name} is {actual[hash_name]}, expecting {value}")
 
 
-def download(url: str, file_name: str = None, headers: dict[str, str] = None):
+def download(
+    url: str,
+    file_name: str = None,
+    headers: dict[str, str] = None,
+    condition: Callable[[HTTPResponse], bool] = None,
+    hashes: dict[str, str] = None,
+) -> tuple[Path, dict[str, str]] | None:
     """
-    return path of the file in cache folder, if fail then return None
+    return path of the file in cache folder and its hashes (md5, sha1, sha256, sha512), if fail then return None
+
+    `condition` validate the response headers before downloading the body, the download is canceled if it return False
+
+    `hashes` is the expected hashes of the file (e.g {"sha256": "..."}), the download is retried if it doesn't match,
+    and skipped if the file is already in the artifact store
     """
     log = LoggerManager().get_log()
     retry = 0
     max_retry = 10
-    task_id = app_progress.add_task(description="", total=None, visible=False)
+    mismatch = 0
+    max_mismatch = 2
     out = cache_folder / file_name
+    artifact_store = ArtifactStore()
+    if hashes:
+        try:
+            out_hashes = artifact_store.install(hashes, out)
+            if out_hashes is not None:
+                log.info(f"Using stored {file_name}, skipping download")
+                return out, out_hashes
+        except OSError as e:
+            log.warning(f"Failed to use the artifact store for {file_name}, {type(e).__name__}: {e}")
+
+    task_id = app_progress.add_task(description="", total=None, visible=False)
     while not app_stop_event.is_set():
         try:
-            dl(task_id, url, out, file_name, headers)
+            out_hashes = dl(task_id, url, out, file_name, headers, condition)
+            if hashes and out_hashes is not None:
+                verify_hashes(out, out_hashes, hashes)
             break
+        except HashMismatch as e:
+            out.unlink(missing_ok=True)
+            app_progress.reset(task_id, total=None, visible=False)
+            # downloading it again once, in case the file changed while downloading
+            mismatch += 1
+            if mismatch == max_mismatch:
+                log.error(f"{e}, canceling")
+                return
+            log.warning(f"{e}, retrying")
+        except DownloadRejected as e:
+            app_progress.update(task_id, visible=False)
+            log.error(f"{e}, its not a file")
+            PartialDownload(out, url).discard()
+            return
         except Exception as e:
             app_progress.reset(task_id, total=None, visible=False)
             retry += 1
             if retry == max_retry:
                 log.warning(f"Reached max retry for {url}, canceling")
-                break
+                PartialDownload(out, url).discard()
+                return
             log.warning(
                 f"There is an error while downloading {url}\n"
                 + f"Attempting to retry. {retry + 1} out of {max_retry}\n"
@@ -179,4 +915,10 @@ def download(url: str, file_name: str = None, headers: dict[str, str] = None):
             )
     if app_stop_event.is_set():
         return
-    return out
+
+    try:
+        # computed while downloading
+        artifact_store.put(out, out_hashes)
+    except OSError as e:
+        log.warning(f"Failed to store {file_name}, {type(e).__name__}: {e}")
+    return out, out_hashes
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import rich.progress
+
+from ..app.app_config import app_headless, app_progress
+
+
+class ProgressCounter:
+    """
+    Downloaded bytes of a single download thread, only the owning thread write to it so it need no lock
+    """
+
+    def __init__(self, task_id: rich.progress.TaskID):
+        self.task_id = task_id
+        self.value = 0
+        # part of value already sent to app_progress, only changed by the aggregator
+        self.published = 0
+
+    def advance(self, size: int) -> None:
+        self.value += size
+
+
+class ProgressAggregator:
+    """
+    Publish the progress of download threads to `app_progress` from a single thread at a fixed rate
+
+    Updating rich progress take its lock and is too slow to do every chunk, the download threads only
+    bump their own counter and the renderer thread send the sum of every counter `RATE` times a second.
+
+    ```python
+    # Example Usage:
+    counter = progress_aggregator.counter(task_id)
+    try:
+        for chunk in chunks:
+            counter.advance(len(chunk))
+    finally:
+        progress_aggregator.release(counter)
+    ```
+    """
+
+    RATE = 10
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__counters: list[ProgressCounter] = []
+        self.__thread: threading.Thread | None = None
+
+    def counter(self, task_id: rich.progress.TaskID) -> ProgressCounter:
+        """
+        Return a new counter of `task_id`, starting the renderer thread if needed
+        """
+        counter = ProgressCounter(task_id)
+        with self.__lock:
+            self.__counters.append(counter)
+            # nothing to render when headless, counters are published when released
+            if self.__thread is None and not app_headless:
+                self.__thread = threading.Thread(target=self.__run, name="progress_aggregator", daemon=True)
+                self.__thread.start()
+        return counter
+
+    def release(self, counter: ProgressCounter) -> None:
+        """
+        Publish the rest of `counter` and stop tracking it
+
+        Should be called before changing the task directly (reset, total, completed), so no stale progress is sent later
+        """
+        with self.__lock:
+            self.__publish([counter])
+            if counter in self.__counters:
+                self.__counters.remove(counter)
+
+    def __publish(self, counters: list[ProgressCounter]) -> None:
+        advances: dict[rich.progress.TaskID, int] = {}
+        for counter in counters:
+            value = counter.value
+            if value != counter.published:
+                advances[counter.task_id] = advances.get(counter.task_id, 0) + value - counter.published
+                counter.published = value
+        for task_id, advance in advances.items():
+            app_progress.update(task_id, advance=advance)
+
+    def __run(self):
+        while True:
+            time.sleep(1 / self.RATE)
+            with self.__lock:
+                self.__publish(self.__counters)
+                if not self.__counters:
+                    # started again by the next counter
+                    self.__thread = None
+                    return
+
+
+progress_aggregator = ProgressAggregator()
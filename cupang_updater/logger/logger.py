@@ -1,11 +1,14 @@
 import logging
+import sys
 import zipfile
 from datetime import datetime
 
 from rich.console import Console
+from rich.errors import MarkupError
 from rich.logging import RichHandler
+from rich.text import Text
 
-from ..app.app_config import app_console
+from ..app.app_config import app_console, app_headless
 
 
 class CustomLogFormatting(logging.Formatter):
@@ -37,6 +40,16 @@ class CustomLogFormatting(logging.Formatter):
         return super().format(record)
 
 
+class PlainLogFormatting(CustomLogFormatting):
+    # headless, one plain line per record without markup
+    def format(self, record):
+        msg = super().format(record)
+        try:
+            return Text.from_markup(msg).plain
+        except MarkupError:
+            return msg
+
+
 class LoggerManagerSingleton(type):
     _instances = {}
 
@@ -71,12 +84,17 @@ class LoggerManager(metaclass=LoggerManagerSingleton):
 
         log_formatter = CustomLogFormatting("%(message)s", datefmt="%X")
 
-        log_handler = RichHandler(
-            console=app_console,
-            rich_tracebacks=True,
-            markup=True,
-            show_path=False,
-        )
+        if app_headless:
+            log_handler = logging.StreamHandler(sys.stdout)
+            log_handler.setFormatter(PlainLogFormatting("%(asctime)s %(levelname)s %(message)s", datefmt="%X"))
+        else:
+            log_handler = RichHandler(
+                console=app_console,
+                rich_tracebacks=True,
+                markup=True,
+                show_path=False,
+            )
+            log_handler.setFormatter(log_formatter)
         file_handler = RichHandler(
             console=Console(
                 file=self.latest_log.open("a", encoding="utf-8"),
@@ -88,7 +106,6 @@ class LoggerManager(metaclass=LoggerManagerSingleton):
 
         log_handler.setLevel(logging.INFO)
         file_handler.setLevel(logging.DEBUG)
-        log_handler.setFormatter(log_formatter)
         file_handler.setFormatter(log_formatter)
 
         log.addHandler(log_handler)
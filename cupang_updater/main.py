@@ -3,6 +3,7 @@ from pathlib import Path
 from rich.prompt import Prompt
 
 from .app.app_config import app_console, app_ext_updater, app_stop_event
+from .cache import HttpCache
 from .config import Config
 from .logger import LoggerManager
 from .manager import ExtManager, ServerUpdaterManager, UpdaterManager
@@ -17,6 +18,7 @@ from .plugin_updater import (
 from .server_updater import PaperUpdater, PurpurUpdater, ServerjarsUpdater
 from .task.scan import scan_plugins
 from .task.update import update_plugins
+from .task.watch import watch_plugins
 
 
 def main():
@@ -43,6 +45,8 @@ def main():
 
         e.register(app_ext_updater)
 
+        HttpCache().no_cache = args.no_cache
+
         log.info(f"Loading config {args.config_path.name}")
         if not args.config_path.exists():
             c = Config.create_config(args.config_path)
@@ -63,7 +67,11 @@ def main():
         c.update_update_order(list(u.get_updaters().keys()))
         c.update_updater_settings(u.get_updater_settings_default())
 
-        if args.scan_only:
+        if args.watch:
+            scan_plugins(c)
+            watch_plugins(c)
+            return
+        elif args.scan_only:
             scan_plugins(c)
             return
         else:
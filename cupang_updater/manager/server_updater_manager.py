@@ -46,6 +46,17 @@ class ServerUpdaterManager(metaclass=ServerUpdaterManagerSingleton):
         result = list(filter(lambda i: i is not None, result))
         return result
 
+    def get_required_hashes(self, server_type: str) -> list[str]:
+        """get the hash names required by the updater that support the `server_type`
+
+        Args:
+            server_type (str): the type of the server e.g, paper, purpur, bungeecord, etc
+
+        Returns:
+            list[str]
+        """
+        return list(dict.fromkeys(x for updater in self.get_updaters(server_type) for x in updater.required_hashes))
+
     def register(self, cls: ServerUpdaterBase):
         """_summary_
 
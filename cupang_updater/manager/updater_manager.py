@@ -52,6 +52,11 @@ class UpdaterManager(metaclass=UpdaterManagerSingleton):
             "updater_settings": sy.as_document({}, sy.EmptyDict() | sy.MapPattern(sy.Str(), sy.EmptyNone() | sy.Any())),
         }
 
+        # how long (in seconds) each updater use a cached response without any request
+        self.__updater_settings_schema[sy.Optional("cache_ttl")] = sy.EmptyDict() | sy.MapPattern(sy.Str(), sy.Int())
+        self.__default["updater_settings"]._validator = sy.Map(self.__updater_settings_schema)
+        self.__default["updater_settings"]["cache_ttl"] = {}
+
         self.__updaters: dict[str, type[PluginUpdaterBase]] = {}
 
     def get_updater_settings_default(self) -> sy.YAML:
@@ -68,6 +73,12 @@ class UpdaterManager(metaclass=UpdaterManagerSingleton):
     def get_updaters(self) -> dict[str, type[PluginUpdaterBase]]:
         return self.__updaters
 
+    def get_required_hashes(self) -> list[str]:
+        """
+        Return hash names required by the registered updaters.
+        """
+        return list(dict.fromkeys(x for updater in self.__updaters.values() for x in updater.required_hashes))
+
     def register(self, cls: PluginUpdaterBase):
         """
         Registers an updater class.
@@ -123,4 +134,8 @@ class UpdaterManager(metaclass=UpdaterManagerSingleton):
             else:
                 self.__default["updater_settings"][cls_config_path] = cls_updater_default
 
+        # CACHE
+        cache_ttl = self.__default["updater_settings"]["cache_ttl"].data or {}
+        self.__default["updater_settings"]["cache_ttl"] = {**cache_ttl, cls_config_path: cls.cache_ttl}
+
         self.__updaters[cls.config_path] = type(cls)
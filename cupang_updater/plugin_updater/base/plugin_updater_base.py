@@ -32,6 +32,7 @@ class PluginUpdaterBase(UpdaterBase):
     - `plugin_config_default`: Default value for plugin config. If `plugin_config_schema` is a mapping type, use YAML string format.
     - `updater_config_schema` (optional): YAML schema for the updater's configuration. Must be a strictyaml schema.
     - `updater_config_default` (if `updater_config_schema` is set): Default value for the updater's configuration. If `updater_config_schema` is a mapping type, use YAML string format.
+    - `required_hashes` (optional): Hash names compared by `check_update`, for example `["md5"]`. Only these are computed when scanning, any other hash is computed when requested.
     """
 
     @property
@@ -122,6 +123,55 @@ class PluginUpdaterBase(UpdaterBase):
         """
         ...
 
+    @classmethod
+    def prefetch(
+        cls,
+        plugins: dict[str, dict[str, Any]],
+        updater_config: dict[str, str] | Any | None = None,
+    ) -> None:
+        """
+        Note: Set this when the update site can check many plugins with a single request
+
+        Called once before any `check_update`, with every plugin that will be checked.
+
+        `plugins` is a mapping of plugin name and its data in the config,
+        your `plugin_config` is in `plugin_data[cls.config_path]` and the known hashes in `plugin_data["hashes"]`.
+
+        Store the result in a class variable, each `check_update` is called from a new instance.
+
+        Should never raise any exception
+        """
+        ...
+
+    @classmethod
+    def identify(cls, plugins: dict[str, dict[str, Any]]) -> dict[str, list[tuple[str, Any]]] | None:
+        """
+        Note: Set this when the update site can find plugins by their hash
+
+        Called when scanning with `--identify`, with every plugin in the plugins folder.
+
+        `plugins` is a mapping of plugin name and its data in the config,
+        your `plugin_config` is in `plugin_data[cls.config_path]` and the known hashes in `plugin_data["hashes"]`.
+        Only plugins that are not configured yet should be looked up.
+
+        Returns a mapping of plugin name and the updates for its `plugin_config`,
+        in the same format as `get_plugin_config_updates`.
+
+        ```python
+            # Example return
+            identified = {
+                "Geyser-Spigot": [
+                    ("id", "wKkoqHrH"),
+                    ("name_startwith", "Geyser-Spigot"),
+                ]
+            }
+            return identified
+        ```
+
+        Should never raise any exception
+        """
+        ...
+
     @abstractmethod
     def get_plugin_name(self) -> str:
         """
@@ -20,6 +20,8 @@ class BukkitUpdater(PluginUpdaterBase):
         # for example 71561 for mythicmobs https://dev.bukkit.org/projects/mythicmobs
         project_id:
     """
+    cache_ttl = 6 * 3600  # in seconds
+    required_hashes = ["md5"]
     api_url = "https://api.curseforge.com/servermods"
     date_regex = re.compile(r"/Date\((\d+)\)/")
 
@@ -28,11 +30,16 @@ class BukkitUpdater(PluginUpdaterBase):
         self.plugin_name = None
         self.plugin_version = None
         self.url: str = None
+        self.file_hashes: dict[str, str] = None
 
     def get_plugin_name(self) -> str:
         # Return the plugin name
         return self.plugin_name
 
+    def get_file_hashes(self) -> dict[str, str] | None:
+        # Return the expected hashes of the download
+        return self.file_hashes
+
     def get_url(self) -> str:
         # Return the download URL
         return self.url
@@ -102,7 +109,7 @@ class BukkitUpdater(PluginUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/octet-stream", "application/zip"],
@@ -111,6 +118,7 @@ class BukkitUpdater(PluginUpdaterBase):
             self.get_log().error(f"When checking update for {self.plugin_name} got url {self.url} but its not a file")
             return False
 
+        self.file_hashes = {"md5": remote_md5}
         # Parse the plugin version from the release data
         self.plugin_version = str(self.parse_version(project_data["name"]))
         return True
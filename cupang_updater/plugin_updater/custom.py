@@ -46,7 +46,7 @@ class CustomUpdater(PluginUpdaterBase):
             return False
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/octet-stream", "application/zip"],
@@ -1,10 +1,13 @@
+import itertools
 import json
+import zlib
 from http import HTTPStatus
 from typing import Any
 
 import strictyaml as sy
 
 from ..utils import FileHash
+from ..utils.rate_limit import rate_limiter
 from .base.plugin_updater_base import PluginUpdaterBase
 
 
@@ -39,11 +42,25 @@ class GithubUpdater(PluginUpdaterBase):
         commit:
         compare_to: commit
     """
-    updater_config_schema = sy.Map({"github_token": sy.EmptyNone() | sy.Str()})
+    updater_config_schema = sy.Map({"github_token": sy.EmptyNone() | sy.Str() | sy.Seq(sy.Str())})
     updater_config_default = """
+        # github_token: a token, or a list of tokens to spread the requests across, for example
+        #   github_token:
+        #     - token1
+        #     - token2
         github_token:
     """
+    cache_ttl = 3600  # in seconds
     api_url = "https://api.github.com"
+    graphql_chunk_size = 50
+    file_content_types = ["application/octet-stream", "application/java-archive", "application/x-java-archive"]
+
+    # rotate between tokens with the same remaining rate limit
+    token_counter = itertools.count()
+    # a repo keep its token until the token has less remaining rate limit than this
+    token_switch_remaining = 10
+    # release and tag data of each repo (lowercase), None if the repo has no release, filled by prefetch
+    prefetched: dict[str, tuple[dict, dict] | None] = {}
 
     def __init__(self) -> None:
         super().__init__()
@@ -70,10 +87,116 @@ class GithubUpdater(PluginUpdaterBase):
         updates = [("commit", self.commit)]
         return updates
 
+    @classmethod
+    def pick_token(cls, github_token: str | list[str] | None, repo: str = None) -> str | None:
+        # the token is part of the http cache key, so each repo stick to the same token while it has rate limit left,
+        # otherwise (or without repo) the token with the most remaining rate limit, unknown is tried first
+        tokens = [github_token] if isinstance(github_token, str) else list(github_token or [])
+        if not tokens:
+            return None
+
+        def remaining(token: str) -> float:
+            remaining = rate_limiter.get_remaining(cls.api_url, {"Authorization": f"Bearer {token}"})
+            return float("inf") if remaining is None else remaining
+
+        if repo:
+            token = tokens[zlib.crc32(repo.lower().encode()) % len(tokens)]
+            if remaining(token) >= cls.token_switch_remaining:
+                return token
+
+        start = next(cls.token_counter) % len(tokens)
+        tokens = tokens[start:] + tokens[:start]
+        return max(tokens, key=remaining)
+
     def get_headers(self) -> dict[str, Any]:
         if self.token:
             return {"Authorization": f"Bearer {self.token}"}
 
+    @classmethod
+    def prefetch(
+        cls,
+        plugins: dict[str, dict[str, Any]],
+        updater_config: dict[str, str] | Any | None = None,
+    ) -> None:
+        cls.prefetched = {}
+
+        # graphql api can only be used with a token
+        tokens = (updater_config or {}).get("github_token")
+        if not tokens:
+            return
+
+        repos: list[str] = []
+        for plugin_data in plugins.values():
+            repo: str = (plugin_data.get(cls.config_path) or {}).get("repo") or ""
+            if len(repo.strip("/").split("/")) == 2 and repo.lower() not in repos:
+                repos.append(repo.lower())
+
+        updater = cls()
+        for i in range(0, len(repos), cls.graphql_chunk_size):
+            updater.token = cls.pick_token(tokens)
+            cls.prefetched.update(updater.get_update_data_graphql(repos[i : i + cls.graphql_chunk_size]))
+        updater.get_log().debug(
+            f"Prefetched {len(cls.prefetched)} repos in {-(-len(repos) // cls.graphql_chunk_size)} requests"
+        )
+
+    def get_update_data_graphql(self, repos: list[str]) -> dict[str, tuple[dict, dict] | None]:
+        # one aliased repository field for each repo, the data is converted to the rest api format
+        variables = {}
+        fields = []
+        for index, repo in enumerate(repos):
+            owner, name = repo.strip("/").split("/")
+            variables[f"owner{index}"], variables[f"name{index}"] = owner, name
+            fields.append(
+                f"repo{index}: repository(owner: $owner{index}, name: $name{index}) {{"
+                " latestRelease { tagName name tag { target { oid } }"
+                " releaseAssets(first: 100) { nodes { name downloadUrl contentType } } } }"
+            )
+        params = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(len(repos)))
+        query = f"query({params}) {{ {' '.join(fields)} }}"
+
+        headers = {"Accept": "application/json", "Content-Type": "application/json", **self.get_headers()}
+        res = self.make_requests(
+            self.make_url(self.api_url, "graphql"),
+            method="POST",
+            headers=headers,
+            data=json.dumps({"query": query, "variables": variables}).encode(),
+            condition=lambda res: HTTPStatus(res.getcode()) == HTTPStatus.OK
+            and res.getheader("content-type", "").split(";", 1)[0].lower() == headers["Accept"].lower(),
+        )
+        if res is None:
+            return {}
+        try:
+            data: dict[str, dict | None] = json.loads(res.read()).get("data") or {}
+        except ValueError:
+            self.get_log().error("Github returned an invalid graphql response")
+            return {}
+
+        result = {}
+        for index, repo in enumerate(repos):
+            repository = data.get(f"repo{index}")
+            if repository is None:
+                # missing or private repo, let the rest api report it
+                continue
+            release = repository.get("latestRelease")
+            if release is None or release.get("tag") is None:
+                result[repo] = None
+                continue
+            release_data = {
+                "tag_name": release["tagName"],
+                "name": release["name"],
+                "assets": [
+                    {
+                        "name": asset["name"],
+                        "browser_download_url": asset["downloadUrl"],
+                        "content_type": asset["contentType"],
+                    }
+                    for asset in release["releaseAssets"]["nodes"]
+                ],
+            }
+            tag_data = {"object": {"sha": release["tag"]["target"]["oid"]}}
+            result[repo] = release_data, tag_data
+        return result
+
     def get_update_data(self, repo: str) -> dict:
         # Perform GET request for release data
         headers = {"Accept": "application/json"}
@@ -133,20 +256,23 @@ class GithubUpdater(PluginUpdaterBase):
         self.plugin_name = plugin_name
         self.plugin_version = plugin_version
 
-        self.token = updater_config["github_token"]
-
         # Extract repository information from plugin configuration
         repo = plugin_config.get("repo")
         if repo is None:
             return False
 
+        self.token = self.pick_token(updater_config["github_token"], repo)
+
         # Extract name_startwith from plugin configuration
         name_startwith = plugin_config.get("name_startwith")
         if name_startwith is None:
             return False
 
         # Retrieve release and tag data
-        data = self.get_update_data(repo)
+        if repo.lower() in self.prefetched:
+            data = self.prefetched[repo.lower()]
+        else:
+            data = self.get_update_data(repo)
         if not data:
             return False
         release_data, tag_data = data
@@ -188,10 +314,14 @@ class GithubUpdater(PluginUpdaterBase):
             return False
         self.url = url
 
-        # Check the file URL for any issues
-        check_file = self.check_head(
-            self.url, condition=lambda res: res.getheader("content-type", "").lower() == "application/octet-stream"
-        )
+        # Check the file URL for any issues, the asset content type is already known
+        if file.get("content_type", "").lower() in self.file_content_types:
+            check_file = True
+        else:
+            check_file = self.check_file(
+                self.url,
+                condition=lambda res: res.getheader("content-type", "").lower() == "application/octet-stream",
+            )
         if not check_file:
             self.get_log().error(f"When checking update for {self.plugin_name} got url {self.url} but its not a file")
             return False
@@ -26,6 +26,7 @@ class JenkinsUpdater(PluginUpdaterBase):
         name_startwith:
         build_number:
     """
+    cache_ttl = 10 * 60  # in seconds
     api_path = "/api/json"
     last_successful_build_param = {"tree": "lastSuccessfulBuild[url]"}
     artifacts_param = {"tree": "artifacts[*]"}
@@ -143,7 +144,7 @@ class JenkinsUpdater(PluginUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/octet-stream", "application/zip"],
@@ -1,5 +1,6 @@
 import ast
 import json
+import re
 from http import HTTPStatus
 from typing import Any
 
@@ -62,8 +63,13 @@ class ModrinthUpdater(PluginUpdaterBase):
         game_versions:
         version_type:
     """
+    cache_ttl = 3600  # in seconds
+    required_hashes = ["sha1"]
     api_url = "https://api.modrinth.com/v2"
 
+    # latest version of each file, keyed by sha1, filled by prefetch
+    bulk_versions: dict[str, dict | None] = {}
+
     def __init__(self) -> None:
         super().__init__()
         self.plugin_name = None
@@ -71,11 +77,16 @@ class ModrinthUpdater(PluginUpdaterBase):
         self.plugin_hash = None
 
         self.url: str = None
+        self.file_hashes: dict[str, str] = None
 
     def get_plugin_name(self) -> str:
         # Return the plugin name
         return self.plugin_name
 
+    def get_file_hashes(self) -> dict[str, str] | None:
+        # Return the expected hashes of the download
+        return self.file_hashes
+
     def get_url(self) -> str:
         # Return the download URL
         return self.url
@@ -84,6 +95,126 @@ class ModrinthUpdater(PluginUpdaterBase):
         # Return the plugin version or None if not available
         return self.plugin_version
 
+    @staticmethod
+    def parse_list(text: str | None) -> tuple[str, ...]:
+        # "paper" or "['paper', 'folia']" to ("paper",) or ("paper", "folia")
+        if not text:
+            return ()
+        if text.startswith("[") and text.endswith("]"):
+            try:
+                return tuple(str(x) for x in ast.literal_eval(text))
+            except (SyntaxError, ValueError):
+                return ()
+        return (text,)
+
+    @classmethod
+    def prefetch(
+        cls,
+        plugins: dict[str, dict[str, Any]],
+        updater_config: dict[str, str] | Any | None = None,
+    ) -> None:
+        cls.bulk_versions = {}
+
+        # the bulk endpoint filter every hash with the same loaders, game_versions, and version_type
+        groups: dict[tuple[tuple[str, ...], tuple[str, ...], str], list[str]] = {}
+        for plugin_data in plugins.values():
+            plugin_config = plugin_data.get(cls.config_path) or {}
+            sha1 = (plugin_data.get("hashes") or {}).get("sha1")
+            if not plugin_config.get("id") or not sha1:
+                continue
+            group = (
+                cls.parse_list(plugin_config.get("loaders")),
+                cls.parse_list(plugin_config.get("game_versions")),
+                (plugin_config.get("version_type") or "release").lower(),
+            )
+            groups.setdefault(group, []).append(sha1)
+
+        updater = cls()
+        headers = {"Accept": "application/json", "Content-Type": "application/json"}
+        for (loaders, game_versions, version_type), hashes in groups.items():
+            body = {"hashes": hashes, "algorithm": "sha1", "version_types": [version_type]}
+            if loaders:
+                body["loaders"] = list(loaders)
+            if game_versions:
+                body["game_versions"] = list(game_versions)
+
+            res = updater.make_requests(
+                cls.make_url(cls.api_url, "version_files", "update"),
+                method="POST",
+                headers=headers,
+                data=json.dumps(body).encode(),
+                condition=lambda res: HTTPStatus(res.getcode()) == HTTPStatus.OK
+                and res.getheader("content-type", "").split(";", 1)[0].lower() == headers["Accept"].lower(),
+            )
+            if res is None:
+                continue
+            try:
+                versions: dict[str, dict] = json.loads(res.read())
+            except ValueError:
+                updater.get_log().error("Modrinth returned an invalid bulk update response")
+                continue
+
+            # hash missing from the response is not on modrinth, checked one by one
+            for sha1 in hashes:
+                cls.bulk_versions[sha1] = versions.get(sha1)
+        updater.get_log().debug(f"Prefetched {len(cls.bulk_versions)} plugins in {len(groups)} requests")
+
+    @staticmethod
+    def guess_name_startwith(filename: str, version_number: str) -> str:
+        # "LuckPerms-Bukkit-5.4.102.jar" to "LuckPerms-Bukkit"
+        stem = filename.rsplit(".", 1)[0] if filename.lower().endswith(".jar") else filename
+        if version_number and version_number in stem:
+            prefix = stem[: stem.index(version_number)]
+        else:
+            prefix = re.split(r"[-_ +]v?\d", stem, maxsplit=1)[0]
+        return prefix.rstrip("-_ +.") or stem
+
+    @classmethod
+    def identify(cls, plugins: dict[str, dict[str, Any]]) -> dict[str, list[tuple[str, Any]]] | None:
+        unidentified: dict[str, str] = {}
+        for plugin_name, plugin_data in plugins.items():
+            plugin_config = plugin_data.get(cls.config_path) or {}
+            sha1 = (plugin_data.get("hashes") or {}).get("sha1")
+            if sha1 and not plugin_config.get("id"):
+                unidentified[sha1] = plugin_name
+        if not unidentified:
+            return
+
+        updater = cls()
+        headers = {"Accept": "application/json", "Content-Type": "application/json"}
+        res = updater.make_requests(
+            cls.make_url(cls.api_url, "version_files"),
+            method="POST",
+            headers=headers,
+            data=json.dumps({"hashes": list(unidentified.keys()), "algorithm": "sha1"}).encode(),
+            condition=lambda res: HTTPStatus(res.getcode()) == HTTPStatus.OK
+            and res.getheader("content-type", "").split(";", 1)[0].lower() == headers["Accept"].lower(),
+        )
+        if res is None:
+            return
+        try:
+            versions: dict[str, dict] = json.loads(res.read())
+        except ValueError:
+            updater.get_log().error("Modrinth returned an invalid hash lookup response")
+            return
+
+        identified = {}
+        for sha1, version in versions.items():
+            plugin_name = unidentified.get(sha1)
+            if plugin_name is None or not version.get("project_id"):
+                continue
+            file = next(
+                (x for x in version.get("files", []) if x.get("hashes", {}).get("sha1") == sha1),
+                None,
+            ) or next(iter(version.get("files", [])), {})
+            update_config = [("id", version["project_id"])]
+            if file.get("filename"):
+                update_config.append(
+                    ("name_startwith", cls.guess_name_startwith(file["filename"], version.get("version_number")))
+                )
+            identified[plugin_name] = update_config
+        return identified
+
     def get_update_data(
         self,
         project_id: str,
@@ -168,13 +299,28 @@ class ModrinthUpdater(PluginUpdaterBase):
         if project_id is None:
             return False
 
+        version_type = plugin_config.get("version_type") or "release"
+
+        # Use the prefetched data, only if the hash belong to the configured project
+        # (a different project_id may be set on purpose, e.g a fork), a slug id is checked one by one
+        release_data = None
+        sha1 = plugin_hash.hashes.get("sha1")
+        if sha1:
+            release_data = self.bulk_versions.get(sha1)
+        if release_data is not None and (
+            release_data.get("project_id") != project_id
+            or release_data.get("version_type", "").lower() != version_type.lower()
+        ):
+            release_data = None
+
         # Retrieve update data from Modrinth
-        release_data = self.get_update_data(
-            project_id,
-            plugin_config.get("loaders"),
-            plugin_config.get("game_versions"),
-            plugin_config.get("version_type") or "release",
-        )
+        if release_data is None:
+            release_data = self.get_update_data(
+                project_id,
+                plugin_config.get("loaders"),
+                plugin_config.get("game_versions"),
+                version_type,
+            )
         if not release_data:
             return False
 
@@ -196,7 +342,7 @@ class ModrinthUpdater(PluginUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/octet-stream", "application/zip"],
@@ -207,6 +353,7 @@ class ModrinthUpdater(PluginUpdaterBase):
             )
             return False
 
+        self.file_hashes = file.get("hashes")
         # Update plugin version to the remote version
         self.plugin_version = remote_version
         return True
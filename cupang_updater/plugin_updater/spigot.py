@@ -18,6 +18,7 @@ class SpigotUpdater(PluginUpdaterBase):
         # for example: 18494 for discordsrv https://www.spigotmc.org/resources/discordsrv.18494/
         resource_id:
     """
+    cache_ttl = 3600  # in seconds
     api_url = "https://api.spiget.org/v2"
 
     def __init__(self) -> None:
@@ -108,7 +109,7 @@ class SpigotUpdater(PluginUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/octet-stream", "application/zip"],
@@ -9,6 +9,8 @@ from .base.server_updater_base import ServerUpdaterBase
 class PaperUpdater(ServerUpdaterBase):
     name = "PaperMC"
     server_type_list = ["paper", "waterfall"]
+    cache_ttl = 10 * 60  # in seconds
+    required_hashes = ["sha256"]
     api_url = "https://api.papermc.io/v2/projects"
 
     def __init__(self) -> None:
@@ -16,6 +18,7 @@ class PaperUpdater(ServerUpdaterBase):
 
         self.url: str = None
         self.build_number: int = None
+        self.file_hashes: dict[str, str] = None
 
     def get_build_number(self) -> int | None:
         return self.build_number
@@ -23,6 +26,9 @@ class PaperUpdater(ServerUpdaterBase):
     def get_url(self) -> str:
         return self.url
 
+    def get_file_hashes(self) -> dict[str, str] | None:
+        return self.file_hashes
+
     def get_update(self, server_type: str, version: str):
         # Perform a GET request to retrieve builds data
         headers = {"Accept": "application/json"}
@@ -66,7 +72,7 @@ class PaperUpdater(ServerUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/zip"],
@@ -78,4 +84,5 @@ class PaperUpdater(ServerUpdaterBase):
             return False
 
         self.build_number = remote_build_number
+        self.file_hashes = {"sha256": remote_sha256}
         return True
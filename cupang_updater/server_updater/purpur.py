@@ -9,6 +9,7 @@ from .base.server_updater_base import ServerUpdaterBase
 class PurpurUpdater(ServerUpdaterBase):
     name = "PurpurMC"
     server_type_list = ["purpur"]
+    cache_ttl = 10 * 60  # in seconds
     api_url = "https://api.purpurmc.org/v2/purpur/"
 
     def __init__(self) -> None:
@@ -54,7 +55,7 @@ class PurpurUpdater(ServerUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             == "application/octet-stream",
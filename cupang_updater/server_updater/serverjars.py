@@ -9,6 +9,8 @@ from .base.server_updater_base import ServerUpdaterBase
 class ServerjarsUpdater(ServerUpdaterBase):
     name = "Serverjars"
     server_type_list = ["purpur", "bungeecord", "velocity"]
+    cache_ttl = 10 * 60  # in seconds
+    required_hashes = ["md5"]
     api_url = "https://serverjars.com/api"
     server_categories = {
         "proxies": [
@@ -26,6 +28,7 @@ class ServerjarsUpdater(ServerUpdaterBase):
 
         self.update_data: dict = None
         self.url: str = None
+        self.file_hashes: dict[str, str] = None
 
     def get_build_number(self) -> int | None:
         return None  # serverjars doesn't have build number
@@ -33,6 +36,9 @@ class ServerjarsUpdater(ServerUpdaterBase):
     def get_url(self) -> str:
         return self.url
 
+    def get_file_hashes(self) -> dict[str, str] | None:
+        return self.file_hashes
+
     def get_update(self, server_type: str, server_category: str, version: str) -> dict | None:
         # Perform a GET request to retrieve update data
         headers = {"Accept": "application/json"}
@@ -80,7 +86,7 @@ class ServerjarsUpdater(ServerUpdaterBase):
         self.url = url
 
         # Check the file URL for any issues
-        check_file = self.check_head(
+        check_file = self.check_file(
             self.url,
             condition=lambda res: res.getheader("content-type", "").lower()
             in ["application/java-archive", "application/zip"],
@@ -91,4 +97,5 @@ class ServerjarsUpdater(ServerUpdaterBase):
             )
             return False
 
+        self.file_hashes = {"md5": remote_md5}
         return True
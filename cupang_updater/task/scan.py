@@ -1,12 +1,16 @@
+import os
 import re
 from copy import deepcopy
+from functools import partial
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import strictyaml as sy
 
 from ..app.app_config import app_status
-from ..checker import jar_info
+from ..cache import ScanIndex
+from ..checker import jar_scan
 from ..cmd.cmd_opt import args
 from ..config import Config
 from ..logger import LoggerManager
@@ -16,6 +20,8 @@ from ..utils.common import reindent
 
 log = LoggerManager().get_log()
 
+scan_index_name = "scan_index.json"
+
 
 def update_from_default(data1: sy.YAML, data2: sy.YAML, name: str = None):
     if args.config_cleanup:
@@ -34,6 +40,63 @@ def update_from_default(data1: sy.YAML, data2: sy.YAML, name: str = None):
     return data1
 
 
+def is_same_hashes(hashes: dict[str, str], known_hashes: dict[str, str | None]) -> bool:
+    """
+    Compare every hash known by both, False if there is nothing to compare
+    """
+    compared = [hashes[k] == v for k, v in known_hashes.items() if v is not None and hashes.get(k) is not None]
+    return bool(compared) and all(compared)
+
+
+def scan_jars(jars: list[Path], hash_names: list[str]) -> Iterator[tuple[str, str, list[str] | None, dict[str, str]]]:
+    """
+    Yield `jar_scan` result of each jar, in the same order as `jars`
+
+    Uses a process pool when `--scan-jobs` is not 1
+    """
+    scan = partial(jar_scan, store_path=args.metadata_store, hash_names=hash_names)
+    jobs = args.scan_jobs if args.scan_jobs > 0 else os.cpu_count() or 1
+    jobs = min(jobs, len(jars))
+    if jobs <= 1:
+        yield from map(scan, jars)
+        return
+
+    log.info(f"Scanning {len(jars)} plugins using {jobs} processes")
+    with Pool(jobs) as pool:
+        yield from pool.imap(scan, jars, chunksize=max(1, len(jars) // (jobs * 4)))
+
+
+def identify_plugins(plugins_config: dict[str, sy.YAML], plugins_folder: Path):
+    """
+    Fill the updater config of plugins found on the update sites by their hash
+    """
+    plugins: dict[str, dict[str, Any]] = {
+        name: plugin_data.data
+        for name, plugin_data in plugins_config.items()
+        if Path(plugins_folder, plugin_data["file"].data).exists()
+    }
+    for updater in UpdaterManager().get_updaters().values():
+        try:
+            identified = updater.identify(plugins) or {}
+        except Exception:
+            log.exception(f"Error when identifying plugins using {updater.name}")
+            continue
+
+        for name, update_config in identified.items():
+            if name not in plugins_config or not update_config:
+                continue
+            log.info(f"[green]Identified {name} using {updater.name}")
+            for key, value in update_config:
+                paths = [x for x in key.strip(".").split(".") if x]
+                if not paths:
+                    plugins_config[name][updater.config_path] = value
+                    continue
+                current = plugins_config[name][updater.config_path]
+                for k in paths[:-1]:
+                    current = current[k]
+                current[paths[-1]] = value
+
+
 def scan_plugins(config: Config) -> None | Any:
     updater_manager = UpdaterManager()
     plugins_folder = Path(config.get("settings.server_folder").data, "plugins")
@@ -71,15 +134,32 @@ def scan_plugins(config: Config) -> None | Any:
             log.error("Could not check plugins because plugins folder is not exist ¯\\_(ツ)_/¯")
             raise FileNotFoundError
 
-        for jar in plugins_folder.glob("*.jar"):
-            hash = FileHash(jar)
-            name, version, authors = jar_info(jar)
+        # unchanged jars (same path, size, mtime and inode) are never opened again
+        scan_index = ScanIndex(config.config_path.with_name(scan_index_name))
+        jars = sorted(plugins_folder.glob("*.jar"), key=lambda k: k.name.lower())
+        jar_stats = {jar: jar.stat() for jar in jars}
+        scanned_jars = {jar: scan_index.get(jar, jar_stats[jar]) for jar in jars}
+
+        # only hashes compared by the updaters, the rest are computed when requested
+        # sha256 is always computed, it identify the jar (change detection, jar metadata store)
+        required_hashes = list(dict.fromkeys(["sha256", *updater_manager.get_required_hashes()]))
+        unscanned_jars = [jar for jar, scanned in scanned_jars.items() if scanned is None]
+        for jar, (name, version, authors, hashes) in zip(unscanned_jars, scan_jars(unscanned_jars, required_hashes)):
+            scanned_jars[jar] = scan_index.put(jar, jar_stats[jar], name, version, authors, hashes)
+
+        for jar in jars:
+            scanned = scanned_jars[jar]
+            name, version, authors = scanned["name"], scanned["version"], scanned["authors"]
+            hashes: dict[str, str] = scanned["hashes"]
+            if any(hashes.get(hash_name) is None for hash_name in required_hashes):
+                # indexed before an updater that requires more hashes was registered
+                hashes = FileHash.with_known_hashes(jar, hashes).digests(*hashes.keys(), *required_hashes)
+                scan_index.put(jar, jar_stats[jar], name, version, authors, hashes)
             default_plugin_data = updater_manager.get_plugin_default()
 
             if plugins_config.get(name, sy.YAML(None, sy.EmptyNone())).data is not None:
-                if (
-                    hash.md5() == plugins_config[name]["hashes"]["md5"].data
-                    and jar.name == plugins_config[name]["file"].data
+                if jar.name == plugins_config[name]["file"].data and is_same_hashes(
+                    hashes, plugins_config[name]["hashes"].data
                 ):
                     continue
             else:
@@ -103,13 +183,13 @@ def scan_plugins(config: Config) -> None | Any:
             plugin_data["authors"] = authors
 
             plugin_hashes = plugin_data["hashes"]
-            plugin_hashes["md5"] = hash.md5()
-            plugin_hashes["sha1"] = hash.sha1()
-            plugin_hashes["sha256"] = hash.sha256()
-            plugin_hashes["sha512"] = hash.sha512()
+            for hash_name in FileHash.SUPPORTED_HASHES:
+                # empty hash is computed when requested
+                plugin_hashes[hash_name] = hashes.get(hash_name)
 
             plugins_config[name] = plugin_data
 
+        scan_index.save()
         status_update("Finished scanning plugins")
 
         if not config.get("settings.keep_removed_plugins", False):
@@ -127,6 +207,11 @@ def scan_plugins(config: Config) -> None | Any:
             update_from_default(plugins_config.get(plugin_name), default_plugin_data, plugin_name)
         status_update("Finished fixing config")
 
+        if args.identify:
+            status_update("Identifying plugins")
+            identify_plugins(plugins_config, plugins_folder)
+            status_update("Finished identifying plugins")
+
         # short the key
         # re-create yaml string
         # parse the yaml string
@@ -11,7 +11,8 @@ import strictyaml as sy
 from rich.console import Group
 
 from ..app.app_config import app_live, app_progress, app_status, app_stop_event
-from ..checker.plugin_checker import jar_info
+from ..cache import ArtifactStore, HttpCache
+from ..checker.plugin_checker import jar_scan
 from ..cmd.cmd_opt import args
 from ..config import Config
 from ..downloader import download
@@ -74,12 +75,21 @@ def handle_server_update(
 
         if check_update:
             status_update(f"Updating {server_type} {server_version}", no_log=True)
-            new_file = download(updater.get_url(), server_file.name, updater.get_headers())
+            new_file = download(
+                updater.get_url(),
+                server_file.name,
+                updater.get_headers(),
+                updater.download_condition,
+                updater.get_file_hashes(),
+            )
             if new_file is None:
                 log.error(f"Trying another server updater for {server_type}")
                 continue
+            new_file, new_file_hashes = new_file
             new_file = Path(shutil.move(new_file.absolute(), (server_folder / server_file).absolute()))
-            return updater.get_build_number(), FileHash(new_file)
+            # computed while downloading
+            new_hash = FileHash.with_known_hashes(new_file, new_file_hashes)
+            return updater.get_build_number(), new_hash
     return
 
 
@@ -100,6 +110,7 @@ def handle_plugin_update(
         if app_stop_event.is_set():
             break
         updater = updater()
+        updater.cache_ttl = (updater_settings.get("cache_ttl") or {}).get(updater.config_path, updater.cache_ttl)
         # the updater config, but in plugins section
         plugin_config = deepcopy([plugin_data[updater.config_path]])[0]
         # the updater config, but in updater settings section
@@ -125,25 +136,31 @@ def handle_plugin_update(
                 updater.get_url(),
                 new_file_name + f" [{new_version or 'Latest'}].jar",
                 updater.get_headers(),
+                updater.download_condition,
+                updater.get_file_hashes(),
             )
             if new_file is None:
                 log.error(f"Trying another plugin updater for {updater.get_plugin_name()}")
                 continue
+            new_file, new_file_hashes = new_file
 
+            try:
+                _, jar_version, _, new_file_hashes = jar_scan(
+                    new_file, args.metadata_store, UpdaterManager().get_required_hashes(), new_file_hashes
+                )
+            except Exception:
+                log.exception(f"Failed to read {new_file.name}")
+                new_file.unlink(missing_ok=True)
+                log.error(f"Trying another plugin updater for {updater.get_plugin_name()}")
+                continue
             if new_version is None:
-                _, new_version, _ = jar_info(new_file)
+                new_version = jar_version
             new_file_name = new_file_name + f" [{new_version}].jar"
-            new_file_hash = FileHash(new_file)
 
             new_plugin_data = {
                 "file": new_file_name,
                 "version": str(new_version),
-                "hashes": {
-                    "md5": new_file_hash.md5(),
-                    "sha1": new_file_hash.sha1(),
-                    "sha256": new_file_hash.sha1(),
-                    "sha512": new_file_hash.sha512(),
-                },
+                "hashes": {k: new_file_hashes.get(k) for k in FileHash.SUPPORTED_HASHES},
                 "update_config": {
                     "path": f"{plugin_name}.{updater.config_path}",
                     "plugin_config": updater.get_plugin_config_updates(),
@@ -151,12 +168,44 @@ def handle_plugin_update(
                 },
             }
 
+            # keep the old jar, going back to it won't need a download
+            # (hashed by put, the hashes in the config may be stale or incomplete)
+            try:
+                ArtifactStore().put(plugin_file)
+            except OSError:
+                log.debug(f"Failed to store {plugin_file.name}", exc_info=True)
             plugin_file.unlink(missing_ok=True)
             shutil.move(new_file.absolute(), (plugins_folder / new_file_name).absolute())
             return updater.get_plugin_name(), new_plugin_data
     return
 
 
+def run_checks_threaded(check_jobs: list[tuple], workers_count: int) -> list:
+    """
+    Run `handle_plugin_update` for each job in a thread pool
+
+    return the result (or the raised exception) of each job, in the same order
+    """
+    workers = ThreadPool(workers_count)
+    worker_jobs: list[ApplyResult] = [workers.apply_async(handle_plugin_update, job) for job in check_jobs]
+    try:
+        while not all([x.ready() for x in worker_jobs]) and not app_stop_event.is_set():
+            time.sleep(1)
+    except (KeyboardInterrupt, ProcessError, Exception):
+        app_stop_event.set()
+    finally:
+        workers.close()
+        workers.join()
+
+    results = []
+    for job in worker_jobs:
+        try:
+            results.append(job.get())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 def update_plugins(config: Config):
     last_update = config.get("settings.last_update").data
     if last_update and not args.force:
@@ -182,15 +231,8 @@ def update_plugins(config: Config):
             if result is not None:
                 new_build_number, new_hash = result
                 config.set("server.build_number", new_build_number)
-                config.set(
-                    "server.hashes",
-                    dict(
-                        md5=new_hash.md5(),
-                        sha1=new_hash.sha1(),
-                        sha256=new_hash.sha256(),
-                        sha512=new_hash.sha512(),
-                    ),
-                )
+                # empty hash is computed when requested
+                config.set("server.hashes", {k: new_hash.hashes.get(k) for k in FileHash.SUPPORTED_HASHES})
             status_update("Finished updating server")
 
         status_update("Prepare updating plugins")
@@ -213,8 +255,7 @@ def update_plugins(config: Config):
 
         plugins: dict[str, dict[str, Any]] = deepcopy(dict(config.get("plugins").data))
 
-        workers = ThreadPool(5)
-        worker_jobs: list[ApplyResult] = []
+        check_jobs: list[tuple] = []
 
         status_update("Adding update jobs")
         for plugin_name, plugin_data in plugins.items():
@@ -232,55 +273,37 @@ def update_plugins(config: Config):
                 continue
 
             # add download job
-            worker_jobs.append(
-                workers.apply_async(
-                    handle_plugin_update,
-                    (
-                        server_folder,
-                        plugin_name,
-                        plugin_data,
-                        config.get("updater_settings").data,
-                        updater_list,
-                    ),
+            check_jobs.append(
+                (
+                    server_folder,
+                    plugin_name,
+                    plugin_data,
+                    config.get("updater_settings").data,
+                    updater_list,
                 )
             )
-            # worker_jobs.append(
-            #     workers.apply_async(
-            #         update_helper,
-            #         (
-            #             updater_list,
-            #             plugin_name,
-            #             plugin_data,
-            #             updated_plugins,
-            #             old_file,
-            #         ),
-            #     )
-            # )
-            # update_helper(
-            #     updater_list,
-            #     plugin_name,
-            #     plugin_data,
-            #     updated_plugins,
-            #     old_file,
-            # )
+
+        # let updaters check many plugins with a single request
+        checked_plugins = {job[1]: job[2] for job in check_jobs}
+        updater_settings = config.get("updater_settings").data
+        for updater in updater_list:
+            try:
+                updater.prefetch(checked_plugins, deepcopy([updater_settings.get(updater.config_path)])[0])
+            except Exception:
+                log.exception(f"Error when prefetching update data for {updater.name}")
 
         status_update("Jobs added, waiting for completion")
-        try:
-            while not all([x.ready() for x in worker_jobs]) and not app_stop_event.is_set():
-                time.sleep(1)
-        except (KeyboardInterrupt, ProcessError, Exception):
-            app_stop_event.set()
-        finally:
-            workers.close()
-            workers.join()
+        results = run_checks_threaded(check_jobs, max(1, args.check_jobs))
 
         def update_config_helper(config_data):
             for k, v in config_data:
                 config.set(f"plugins.{update_config_path}.{k.strip('.')}", v)
 
         status_update("Updating config")
-        for job in worker_jobs:
-            result = job.get()
+        for result in results:
+            if isinstance(result, BaseException):
+                log.error("Error when checking update", exc_info=result)
+                continue
             if result is None:
                 continue
             plugin_name, new_plugin_data = result
@@ -303,4 +326,6 @@ def update_plugins(config: Config):
         config.update_last_update()
         config.save()
         config.reload()
+        HttpCache().prune()
+        ArtifactStore().prune()
         status_update("Finished updating plugins")
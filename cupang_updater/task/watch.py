@@ -0,0 +1,170 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from ..app.app_config import app_stop_event
+from ..cmd.cmd_opt import args
+from ..config import Config
+from ..logger import LoggerManager
+from .scan import scan_plugins
+
+log = LoggerManager().get_log()
+
+
+class PollingWatcher:
+    """
+    Detect added, changed, or removed jars by comparing the stat of every jar in a folder
+    """
+
+    def __init__(self, folder: Path, interval: float = 2.0):
+        self.folder = folder
+        self.interval = interval
+        self.snapshot = self.__snapshot()
+
+    def __snapshot(self) -> dict[str, tuple[int, int, int]]:
+        snapshot = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jar") and entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return snapshot
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Return True if a jar changed within `timeout` seconds
+        """
+        deadline = time.monotonic() + timeout
+        while not app_stop_event.is_set():
+            snapshot = self.__snapshot()
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+        return False
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detect added, changed, or removed jars in a folder using linux inotify
+    """
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, folder: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.folder = folder
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # not IN_CREATE, it fires before the jar is written, IN_CLOSE_WRITE follows once it is
+        mask = (
+            self.IN_ATTRIB
+            | self.IN_CLOSE_WRITE
+            | self.IN_MOVED_FROM
+            | self.IN_MOVED_TO
+            | self.IN_DELETE
+            | self.IN_DELETE_SELF
+            | self.IN_MOVE_SELF
+        )
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+
+    def __read_events(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 2**10)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_size = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset : offset + name_size].rstrip(b"\0")
+                offset += name_size
+                if mask & (self.IN_Q_OVERFLOW | self.IN_DELETE_SELF | self.IN_MOVE_SELF) or name.endswith(b".jar"):
+                    changed = True
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Return True if a jar changed within `timeout` seconds
+        """
+        deadline = time.monotonic() + timeout
+        while not app_stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # wake up every second to check app_stop_event
+            readable, _, _ = select.select([self.fd], [], [], min(remaining, 1.0))
+            if readable and self.__read_events():
+                return True
+        return False
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_watcher(folder: Path) -> InotifyWatcher | PollingWatcher:
+    try:
+        return InotifyWatcher(folder)
+    except (OSError, AttributeError, TypeError):
+        # no inotify (not linux, or inotify_init1 missing from libc)
+        log.warning("inotify is not available, would use polling instead")
+        return PollingWatcher(folder)
+
+
+def watch_plugins(config: Config):
+    """
+    Keep the process running and rescan plugins whenever a jar in the plugins folder is added, changed, or removed
+
+    Burst of changes (e.g copying many jars) is collapsed into a single rescan after `--watch-delay` seconds of quiet
+    """
+    plugins_folder = Path(config.get("settings.server_folder").data, "plugins")
+    watcher = get_watcher(plugins_folder)
+    log.info(f"Watching {plugins_folder} for changes, press Ctrl+C to stop")
+    try:
+        while not app_stop_event.is_set():
+            if not watcher.wait(60):
+                continue
+            # debounce, wait until nothing changed for watch_delay seconds
+            while watcher.wait(args.watch_delay):
+                pass
+            if app_stop_event.is_set():
+                break
+
+            log.info("Plugins folder changed, rescanning")
+            try:
+                # pick up changes made to config.yaml while watching, scan_plugins save the config
+                config.reload()
+                scan_plugins(config)
+            except Exception:
+                # e.g a jar that is still being copied, it is rescanned when the copy is finished
+                log.exception("Error when rescanning plugins, would keep watching")
+    finally:
+        watcher.close()
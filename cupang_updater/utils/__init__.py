@@ -1,5 +1,5 @@
 from .common import ensure_path, list_get, parse_version, reindent
 from .date import Date
-from .files import dir_rmdir, file_rm_suffix
+from .files import clone_file, dir_rmdir, file_rm_suffix, reserve_space
 from .hash import FileHash
-from .url import make_requests, make_url
+from .url import make_requests, make_url, open_url
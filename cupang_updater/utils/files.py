@@ -1,6 +1,18 @@
+import ctypes
+import ctypes.util
+import errno
+import os
 import shutil
 import stat
+import sys
+from functools import cache
 from pathlib import Path
+from typing import Callable
+
+# linux ioctl to share the data blocks of a file (btrfs, xfs, ...)
+FICLONE = 0x40049409
+# linux fallocate mode, reserve the blocks without changing the file size
+FALLOC_FL_KEEP_SIZE = 0x01
 
 
 def file_rm_suffix(file: Path):
@@ -28,3 +40,95 @@ def dir_rmdir(dir: Path):
     for _ in dir.rglob("*"):
         _.chmod(stat.S_IWRITE)
     shutil.rmtree(dir.absolute())
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    """
+    Make `dst` a copy of `src` without copying the data if possible.
+
+    Tries a reflink (copy-on-write clone), then a hardlink, then a regular copy.
+
+    Parameters:
+    - src: Path to the source file.
+    - dst: Path to the destination, replaced if it exists.
+
+    Returns:
+    - How it was made, one of "reflink", "hardlink", or "copy".
+    """
+    dst.unlink(missing_ok=True)
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with src.open("rb") as src_file, dst.open("wb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            shutil.copystat(src, dst)
+            return "reflink"
+        except OSError:
+            dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+@cache
+def get_libc_fallocate() -> Callable[[int, int, int, int], int] | None:
+    """
+    Return the fallocate function of libc, loaded once.
+
+    Returns:
+    - fallocate(fd, mode, offset, length), or None if libc or fallocate can't be found.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fallocate = libc.fallocate
+    except (OSError, AttributeError, TypeError):
+        return None
+    fallocate.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64)
+    return fallocate
+
+
+def reserve_space(fd: int, offset: int, length: int, keep_size: bool = True) -> bool:
+    """
+    Reserve disk blocks for `length` bytes from `offset` of an open file.
+
+    The file is then written into contiguous blocks, and a full disk is reported before downloading.
+    With `keep_size`, the size is kept so a partially written file still has the size of its written bytes,
+    this needs linux fallocate. Otherwise `os.posix_fallocate` is used, which grow the file to `offset + length`.
+
+    Parameters:
+    - fd: File descriptor of the open file.
+    - offset: Start of the reserved range.
+    - length: Size of the reserved range.
+    - keep_size: Don't change the file size.
+
+    Returns:
+    - True if reserved, False if not supported by the os or the file system.
+
+    Raises:
+    - OSError: If there is not enough space.
+    """
+    if length <= 0:
+        return False
+    if not keep_size and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, offset, length)
+            return True
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            return False
+    if not sys.platform.startswith("linux"):
+        return False
+    fallocate = get_libc_fallocate()
+    if fallocate is None:
+        return False
+    if fallocate(fd, FALLOC_FL_KEEP_SIZE if keep_size else 0, offset, length) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error == errno.ENOSPC:
+        raise OSError(error, os.strerror(error))
+    return False
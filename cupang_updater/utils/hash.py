@@ -1,6 +1,6 @@
 import hashlib
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterable
 
 from .common import ensure_path
 
@@ -13,11 +13,19 @@ class FileHash:
     file_hasher = FileHash("example.txt")
     md5_hash = file_hasher.md5()
     sha256_hash = file_hasher.sha256()
+
+    # compute many hashes with a single read of the file
+    hashes = file_hasher.digests("md5", "sha256")
+    all_hashes = file_hasher.compute_all()
     ```
 
     """
 
-    DEFAULT_CHUNK_SIZE = 64 * 2**10
+    SUPPORTED_HASHES = ("md5", "sha1", "sha256", "sha512")
+    # hashlib release the GIL when updating with buffer larger than 2047 bytes,
+    # a big chunk keep the time spent holding the GIL (reading, looping) small
+    # so several files can be hashed in parallel using threads
+    DEFAULT_CHUNK_SIZE = 1024 * 2**10
 
     def __init__(self, file: Path | str):
         self.file = ensure_path(file)
@@ -50,23 +58,51 @@ class FileHash:
             instance.hashes.update(known_hashes)
         return instance
 
-    def __hash(self, stream: BinaryIO, hash_tool) -> str:
+    def __hash(self, stream: BinaryIO, hash_tools: Iterable) -> None:
+        hash_tools = list(hash_tools)
+        buffer = bytearray(self.DEFAULT_CHUNK_SIZE)
+        view = memoryview(buffer)
         while True:
-            data = stream.read(self.DEFAULT_CHUNK_SIZE)
-            if not data:
+            size = stream.readinto(buffer)
+            if not size:
                 break
-            hash_tool.update(data)
-        return hash_tool.hexdigest()
+            data = view[:size]
+            for hash_tool in hash_tools:
+                hash_tool.update(data)
+
+    def digests(self, *hash_names: str) -> dict[str, str]:
+        """
+        Computes and returns the requested hash values, reading the file only once.
+
+        Already known hash values are not computed again.
+
+        Parameters:
+        - hash_names: Name of the hash algorithm, for example "md5" or "sha256".
+            Defaults to all of `SUPPORTED_HASHES`.
+
+        Returns:
+        - Dictionary of hash name and its hash value.
+        """
+        hash_names = hash_names or self.SUPPORTED_HASHES
+
+        missing = [hash_name for hash_name in dict.fromkeys(hash_names) if self.hashes.get(hash_name) is None]
+        if missing:
+            hash_tools = {hash_name: hashlib.new(hash_name) for hash_name in missing}
+            with self.file.open("rb") as stream:
+                self.__hash(stream, hash_tools.values())
+            for hash_name, hash_tool in hash_tools.items():
+                self.hashes[hash_name] = hash_tool.hexdigest()
+
+        return {hash_name: self.hashes[hash_name] for hash_name in hash_names}
+
+    def compute_all(self) -> dict[str, str]:
+        """
+        Computes and returns MD5, SHA-1, SHA-256, and SHA-512 hash values with a single read of the file.
+        """
+        return self.digests(*self.SUPPORTED_HASHES)
 
     def __get_hash(self, hash_name: str) -> str:
-        hash = self.hashes.get(hash_name)
-        if hash is not None:
-            return hash
-
-        hash_tool = hashlib.new(hash_name)
-        hash = self.__hash(self.file.open("rb"), hash_tool)
-        self.hashes[hash_tool] = hash
-        return hash
+        return self.digests(hash_name)[hash_name]
 
     def md5(self) -> str:
         """
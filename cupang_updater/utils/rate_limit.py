@@ -0,0 +1,179 @@
+import hashlib
+import threading
+import time
+import urllib.parse
+from email.message import Message
+from email.utils import parsedate_to_datetime
+
+from ..app.app_config import app_stop_event
+
+
+class RateLimitBucket:
+    """
+    Request budget of a host for a single client (token)
+    """
+
+    def __init__(self):
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        # unix time when the budget is refilled
+        self.reset: float | None = None
+        # no request is sent before this unix time (Retry-After)
+        self.blocked_until: float = 0.0
+        # the low budget warning is logged once until the budget is refilled
+        self.warned = False
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when the budget of a host is refilled later than the allowed wait
+    """
+
+    def __init__(self, host: str, wait: float):
+        super().__init__(f"rate limit of {host} is exceeded, refilled in {round(wait)} seconds")
+        self.host = host
+        self.wait = wait
+
+
+class RateLimiter:
+    """
+    Thread-safe request scheduler that honour X-RateLimit-* and Retry-After response headers
+
+    Each (host, token) has its own budget, requests wait until the budget is refilled
+    instead of being sent and rejected
+    """
+
+    MAX_WAIT = 300
+    MAX_RETRIES = 3
+    # the retry delay when a rate limit response tell nothing about when to retry
+    DEFAULT_RETRY_AFTER = 60
+    # the reset header is either unix time (github) or seconds from now (modrinth)
+    RELATIVE_RESET_LIMIT = 10**9
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__buckets: dict[tuple[str, str], RateLimitBucket] = {}
+
+    @staticmethod
+    def make_key(url: str, headers: dict[str, str] | None) -> tuple[str, str]:
+        """
+        Return (host, client), the client is a digest of the authorization header
+        """
+        host = urllib.parse.urlsplit(url).hostname or ""
+        authorization = next((v for k, v in (headers or {}).items() if k.lower() == "authorization"), "")
+        client = hashlib.sha1(authorization.encode()).hexdigest()[:12] if authorization else "anonymous"
+        return host, client
+
+    def get_remaining(self, url: str, headers: dict[str, str] | None = None) -> int | None:
+        """
+        Return the remaining budget, None if unknown
+        """
+        with self.__lock:
+            bucket = self.__buckets.get(self.make_key(url, headers))
+            if bucket is None or bucket.remaining is None:
+                return None
+            if bucket.reset is not None and bucket.reset <= time.time():
+                return bucket.limit
+            return bucket.remaining
+
+    def acquire(self, url: str, headers: dict[str, str] | None = None, max_wait: float = None) -> None:
+        """
+        Wait until a request can be sent, and take one from the budget
+
+        Raise RateLimitExceeded if the wait is longer than `max_wait` (default `MAX_WAIT`)
+        """
+        key = self.make_key(url, headers)
+        max_wait = self.MAX_WAIT if max_wait is None else max_wait
+        while not app_stop_event.is_set():
+            with self.__lock:
+                bucket = self.__buckets.get(key)
+                if bucket is None:
+                    return
+                now = time.time()
+                if bucket.reset is not None and bucket.reset <= now and bucket.limit is not None:
+                    # refilled, until told otherwise by the next response
+                    bucket.remaining, bucket.reset = bucket.limit, None
+
+                wait = bucket.blocked_until - now
+                if wait <= 0 and bucket.remaining is not None and bucket.remaining <= 0:
+                    wait = (bucket.reset or now + self.DEFAULT_RETRY_AFTER) - now
+                if wait <= 0:
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return
+            if wait > max_wait:
+                raise RateLimitExceeded(key[0], wait)
+
+            from ..logger import LoggerManager
+
+            LoggerManager().get_log().info(f"Rate limited by {key[0]}, waiting {round(wait)} seconds")
+            app_stop_event.wait(wait)
+
+    def update(self, url: str, headers: dict[str, str] | None, status: int, res_headers: Message) -> bool:
+        """
+        Update the budget from the response headers
+
+        Return True if the response is a rate limit rejection, and the request can be retried
+        """
+        key = self.make_key(url, headers)
+        remaining = self.__parse_int(res_headers.get("x-ratelimit-remaining"))
+        limit = self.__parse_int(res_headers.get("x-ratelimit-limit"))
+        reset = self.__parse_int(res_headers.get("x-ratelimit-reset"))
+        retry_after = self.__parse_retry_after(res_headers.get("retry-after"))
+        if remaining is None and retry_after is None and status != 429:
+            return False
+
+        now = time.time()
+        if reset is not None and reset < self.RELATIVE_RESET_LIMIT:
+            reset += now
+        is_limited = status == 429 or (status == 403 and (remaining == 0 or retry_after is not None))
+        is_low = bool(limit) and remaining is not None and remaining <= limit // 10
+        warn = False
+
+        with self.__lock:
+            bucket = self.__buckets.setdefault(key, RateLimitBucket())
+            if remaining is not None:
+                bucket.remaining = remaining
+                bucket.limit = limit if limit is not None else bucket.limit
+                bucket.reset = reset
+                warn = is_low and not bucket.warned
+                bucket.warned = is_low
+            if retry_after is not None:
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+            elif is_limited and remaining is None:
+                bucket.blocked_until = max(bucket.blocked_until, now + self.DEFAULT_RETRY_AFTER)
+
+        if remaining is not None:
+            from ..logger import LoggerManager
+
+            log = LoggerManager().get_log()
+            msg = f"{key[0]} rate limit remaining {remaining}" + (f"/{limit}" if limit is not None else "")
+            if warn:
+                log.warning(msg)
+            else:
+                log.debug(msg)
+        return is_limited
+
+    @staticmethod
+    def __parse_int(value: str | None) -> int | None:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def __parse_retry_after(value: str | None) -> float | None:
+        # either seconds or http date
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+rate_limiter = RateLimiter()
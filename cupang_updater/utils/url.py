@@ -1,9 +1,17 @@
+import http.client
+import io
+import ssl
+import threading
 import urllib.error
 import urllib.parse
 import urllib.request
+from contextlib import contextmanager
+from email.message import Message
 from http.client import HTTPResponse
+from typing import Iterator
 
-from ..app.app_config import app_headers
+from ..app.app_config import app_headers, app_stop_event
+from .rate_limit import rate_limiter
 
 
 # from https://stackoverflow.com/a/43934565
@@ -34,29 +42,301 @@ def make_url(base_url: str, *url_paths: str, **url_params: dict[str, str]):
     return url
 
 
-def make_requests(url: str, method: str = "GET", headers: dict[str, str] = None) -> HTTPResponse:
+class PooledHTTPSConnection(http.client.HTTPSConnection):
     """
-    Safely create a request using urllib.request.
+    HTTPSConnection that resume the TLS session of the previous connection to the same host
+    """
+
+    def __init__(self, *args, tls_sessions: dict[str, ssl.SSLSession], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tls_sessions = tls_sessions
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=self.host, session=self.tls_sessions.get(self.host)
+        )
+
+    def save_tls_session(self):
+        # tls 1.3 session ticket is only available after some data is read
+        session = getattr(self.sock, "session", None)
+        if session is not None:
+            self.tls_sessions[self.host] = session
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP(S) connections keyed by (scheme, host, port)
+
+    Connections are reused between requests to the same host and TLS sessions are resumed,
+    which avoid a new TCP and TLS handshake for every request
+
+    At most `MAX_CONNECTIONS_PER_HOST` requests to the same host are in flight at once,
+    other requests wait until a response is released, or until the app is stopping
+    """
+
+    MAX_IDLE_PER_HOST = 8
+    MAX_CONNECTIONS_PER_HOST = 8
+    MAX_REDIRECTS = 10
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self.__slots: dict[tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self.__tls_sessions: dict[str, ssl.SSLSession] = {}
+        self.__ssl_context = ssl.create_default_context()
+
+    def __new_connection(self, key: tuple[str, str, int], timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return PooledHTTPSConnection(
+                host, port, timeout=timeout, context=self.__ssl_context, tls_sessions=self.__tls_sessions
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def __get_slots(self, key: tuple[str, str, int]) -> threading.BoundedSemaphore:
+        with self.__lock:
+            slots = self.__slots.get(key)
+            if slots is None:
+                slots = self.__slots[key] = threading.BoundedSemaphore(self.MAX_CONNECTIONS_PER_HOST)
+            return slots
+
+    def __acquire(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self.__lock:
+            idle = self.__idle.get(key)
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        return self.__new_connection(key, timeout), False
+
+    def release(self, res: HTTPResponse):
+        """
+        Give back the connection of `res` to the pool, the connection is closed if it cannot be reused
+
+        Only a fully read response can reuse its connection
+        """
+        connection: http.client.HTTPConnection = getattr(res, "connection", None)
+        if connection is None:
+            return
+        res.connection = None
+        res.pool_slots.release()
+        if not res.isclosed() or res.will_close or connection.sock is None:
+            res.close()
+            connection.close()
+            return
+        if isinstance(connection, PooledHTTPSConnection):
+            connection.save_tls_session()
+        with self.__lock:
+            idle = self.__idle.setdefault(res.pool_key, [])
+            if len(idle) < self.MAX_IDLE_PER_HOST:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def __send(
+        self, url: str, method: str, headers: dict[str, str], data: bytes | None, timeout: float
+    ) -> HTTPResponse:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unknown url type: {parsed.scheme}")
+        key = (parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+        path = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+
+        slots = self.__get_slots(key)
+        while not slots.acquire(timeout=1):
+            if app_stop_event.is_set():
+                raise ConnectionAbortedError(f"canceled while waiting for a connection to {parsed.hostname}")
+        try:
+            connection, reused = self.__acquire(key, timeout)
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                res = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                # the server closed the idle connection, try again with a new one
+                connection = self.__new_connection(key, timeout)
+                connection.request(method, path, body=data, headers=headers)
+                res = connection.getresponse()
+            except BaseException:
+                connection.close()
+                raise
+        except BaseException:
+            slots.release()
+            raise
+        res.connection = connection
+        res.pool_key = key
+        res.pool_slots = slots
+        res.url = url
+        return res
+
+    def request(
+        self,
+        url: str,
+        method: str = "GET",
+        headers: dict[str, str] = None,
+        data: bytes = None,
+        timeout: float = 60,
+    ) -> HTTPResponse:
+        """
+        Send a request, following redirects like urllib.request.urlopen
+
+        The response is not read, call `release()` after reading it
+
+        Raise urllib.error.HTTPError if the response status is not 2xx
+        """
+        headers = dict(headers or {})
+        for _ in range(self.MAX_REDIRECTS + 1):
+            res = self.__send(url, method, headers, data, timeout)
+            location = res.getheader("location")
+            if res.status in self.REDIRECT_CODES and location:
+                res.read()
+                self.release(res)
+                url = urllib.parse.urljoin(url, location)
+                if res.status in (301, 302, 303) and method not in ("GET", "HEAD"):
+                    method, data = "GET", None
+                    headers = {k: v for k, v in headers.items() if k.lower() not in ("content-type", "content-length")}
+                continue
+            if not 200 <= res.status < 300:
+                body = res.read()
+                self.release(res)
+                raise urllib.error.HTTPError(url, res.status, res.reason, res.headers, io.BytesIO(body))
+            return res
+        raise urllib.error.HTTPError(url, res.status, "Too many redirects", res.headers, None)
+
+
+class BufferedResponse(io.BytesIO):
+    """
+    Already read response, behave like the HTTPResponse returned by urllib.request.urlopen
+
+    The body is a BytesIO, so read, readinto, readline, iteration, and the other file methods work as usual
+    """
+
+    def __init__(self, url: str, status: int, reason: str, headers: Message, body: bytes):
+        super().__init__(body)
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        # HTTP/1.1, as HTTPResponse.version
+        self.version = 11
+
+    @property
+    def msg(self) -> Message:
+        return self.headers
+
+    @property
+    def code(self) -> int:
+        return self.status
+
+    @property
+    def length(self) -> int:
+        # remaining bytes of the body, as HTTPResponse.length
+        return len(self.body) - self.tell()
+
+    def info(self) -> Message:
+        return self.headers
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def getheader(self, name: str, default: str = None) -> str | None:
+        values = self.headers.get_all(name)
+        if not values:
+            return default
+        return ", ".join(values)
+
+    def getheaders(self) -> list[tuple[str, str]]:
+        return list(self.headers.items())
+
+
+connection_pool = ConnectionPool()
+
+
+def is_proxied(url: str) -> bool:
+    """
+    Return True if `url` should go through a proxy set by the environment (e.g https_proxy)
+    """
+    parsed = urllib.parse.urlsplit(url)
+    return parsed.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parsed.hostname or "")
+
+
+@contextmanager
+def open_url(
+    url: str, method: str = "GET", headers: dict[str, str] = None, data: bytes = None, timeout: float = 60
+) -> Iterator[HTTPResponse]:
+    """
+    Open a streaming response using the shared connection pool.
+
+    The connection goes back to the pool when leaving the context if the response was fully read.
+
+    :param url: The URL for the request.
+    :type url: str
+    :param method: The HTTP method to use (default is "GET").
+    :type method: str
+    :param headers: Optional headers for the request, merged with app_headers.
+    :type headers: dict[str, str] | None
+    :param data: Optional request body.
+    :type data: bytes | None
+    :param timeout: Connection and read timeout in seconds.
+    :type timeout: float
+    :return: The unread HTTPResponse.
+    :rtype: HTTPResponse
+    """
+    headers = {**app_headers, **(headers or {})}
+    if is_proxied(url):
+        with urllib.request.urlopen(
+            urllib.request.Request(url, data=data, method=method, headers=headers), timeout=timeout
+        ) as res:
+            yield res
+        return
+
+    res = connection_pool.request(url, method=method, headers=headers, data=data, timeout=timeout)
+    try:
+        yield res
+    finally:
+        connection_pool.release(res)
+
+
+def make_requests(
+    url: str, method: str = "GET", headers: dict[str, str] = None, data: bytes = None
+) -> BufferedResponse:
+    """
+    Safely create a request using the shared keep-alive connection pool.
 
     Recommended to use this method instead of creating a new one.
 
+    The response body is read right away so the connection can be reused.
+
+    Requests wait for the rate limit budget of the host, and rate limited requests are retried.
+
     :param url: The URL for the request.
     :type url: str
     :param method: The HTTP method to use (default is "GET").
     :type method: str
     :param headers: Optional headers for the request.
     :type headers: dict[str, str] | None
-    :return: A HTTPResponse object if successful, otherwise None.
-    :rtype: HTTPResponse | None
-    """
-    if not headers:
-        headers = {}
-    headers = {**app_headers, **headers}
-    res: HTTPResponse = urllib.request.urlopen(
-        urllib.request.Request(
-            url,
-            method=method,
-            headers=headers,
-        )
-    )
-    return res
+    :param data: Optional request body.
+    :type data: bytes | None
+    :return: A response object if successful, raise urllib.error.HTTPError if the status is not 2xx.
+    :rtype: BufferedResponse
+    """
+    for retry in range(rate_limiter.MAX_RETRIES + 1):
+        rate_limiter.acquire(url, headers)
+        try:
+            with open_url(url, method=method, headers=headers, data=data) as res:
+                body = res.read()
+                rate_limiter.update(url, headers, res.status, res.headers)
+                return BufferedResponse(res.url, res.status, res.reason, res.headers, body)
+        except urllib.error.HTTPError as e:
+            if not rate_limiter.update(url, headers, e.code, e.headers) or retry == rate_limiter.MAX_RETRIES:
+                raise
@@ -0,0 +1,90 @@
+import sys
+import threading
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
+
+import pytest
+
+pycurl = pytest.importorskip("pycurl")
+
+# the app parse the command line when imported
+with mock.patch.object(sys, "argv", sys.argv[:1]):
+    from cupang_updater.downloader.downloader import CurlMultiEngine
+
+BODY = bytes(range(256)) * 4096
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/file.jar"
+    server.shutdown()
+    server.server_close()
+
+
+def make_curl(url: str, out: BytesIO, write=None) -> pycurl.Curl:
+    curl = pycurl.Curl()
+    curl.setopt(pycurl.URL, url)
+    curl.setopt(pycurl.WRITEFUNCTION, write or out.write)
+    return curl
+
+
+def test_submit_does_not_block(server_url):
+    engine = CurlMultiEngine()
+    outs = [BytesIO() for _ in range(8)]
+    done = []
+    futures = [engine.submit(make_curl(server_url, out)) for out in outs]
+    for future in futures:
+        future.add_done_callback(done.append)
+
+    finished, _ = wait(futures, timeout=30)
+    assert len(finished) == len(futures)
+    assert len(done) == len(futures)
+    for future, out in zip(futures, outs):
+        assert future.exception() is None
+        assert out.getvalue() == BODY
+
+
+def test_failed_transfer(server_url):
+    engine = CurlMultiEngine()
+    # nothing listen on port 1
+    future = engine.submit(make_curl("http://127.0.0.1:1/file.jar", BytesIO()))
+    with pytest.raises(pycurl.error):
+        future.result(timeout=30)
+
+
+def test_resume_paused_transfer(server_url):
+    engine = CurlMultiEngine()
+    out = BytesIO()
+    paused = threading.Event()
+    curl = None
+
+    def write(chunk: bytes):
+        if not paused.is_set():
+            # curl give the same chunk again when resumed
+            paused.set()
+            threading.Timer(0.2, engine.resume, (curl,)).start()
+            return pycurl.WRITEFUNC_PAUSE
+        out.write(chunk)
+
+    curl = make_curl(server_url, out, write)
+    engine.submit(curl).result(timeout=30)
+    assert paused.is_set()
+    assert out.getvalue() == BODY